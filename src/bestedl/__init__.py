@@ -0,0 +1,159 @@
+"""
+Bestedl - resumable, checksummed downloads shared by bestekar and besteml
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Union
+
+from loguru import logger
+
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Files at least this large are fetched in parallel byte ranges
+DOWNLOAD_SEGMENT_THRESHOLD = 64 * 1024 * 1024
+
+class DownloadError(RuntimeError):
+    """Raised when a file could not be fetched from any of its URLs."""
+
+def _sha256_of(path: Union[str, Path]) -> str:
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _linked_sha256(response) -> Optional[str]:
+    """SHA-256 advertised by the server (Hugging Face LFS ``X-Linked-Etag``)."""
+    import re
+
+    for r in list(response.history) + [response]:
+        for header in ("X-Linked-Etag", "ETag"):
+            value = r.headers.get(header, "").strip('W/"')
+            if re.fullmatch(r"[0-9a-f]{64}", value):
+                return value
+    return None
+
+def _fetch_range(session, url: str, part: Path, start: int, end: Optional[int], timeout: int) -> None:
+    """Append bytes ``start + len(part) .. end`` of ``url`` to ``part``."""
+    offset = part.stat().st_size if part.exists() else 0
+    if end is not None and start + offset > end:
+        return
+    headers = {}
+    if start + offset > 0 or end is not None:
+        headers["Range"] = f"bytes={start + offset}-{'' if end is None else end}"
+    with session.get(url, stream=True, timeout=timeout, headers=headers) as response:
+        if response.status_code == 416 and offset and end is None:
+            return  # part already holds the whole file; the caller verifies it
+        response.raise_for_status()
+        if headers and response.status_code != 206:
+            if start > 0:
+                raise DownloadError(f"{url} ignored a range request")
+            offset = 0  # server restarted from byte 0
+        with open(part, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+
+def download_file(
+    urls: Union[str, List[str]],
+    dest: Union[str, Path],
+    sha256: Optional[str] = None,
+    segments: int = 4,
+    timeout: int = 60,
+    session=None,
+) -> str:
+    """Download the first reachable URL in ``urls`` to ``dest``.
+
+    Bytes go to a ``.part`` file next to ``dest`` (one per URL) that is
+    renamed into place only once its size and SHA-256 check out, so an
+    interrupted download is never mistaken for a finished one.  A leftover
+    ``.part`` file is resumed with an HTTP Range request, and large files on
+    servers that accept ranges are fetched in ``segments`` parallel ranges.
+    The checksum is ``sha256`` when given, otherwise the one the server
+    advertises (Hugging Face LFS), if any.
+    """
+    import hashlib
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    dest = Path(dest)
+    urls = [urls] if isinstance(urls, str) else list(urls)
+    if dest.exists():
+        if not sha256 or _sha256_of(dest) == sha256:
+            return str(dest)
+        logger.warning(f"Checksum mismatch for existing {dest.name}, downloading again")
+        dest.unlink()
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    session = session or requests.Session()
+
+    errors = []
+    for url in urls:
+        part = dest.with_name(f"{dest.name}.{hashlib.sha1(url.encode()).hexdigest()[:8]}.part")
+        try:
+            head = session.head(url, allow_redirects=True, timeout=timeout)
+            head.raise_for_status()
+            size = int(head.headers.get("Content-Length", 0)) or None
+            ranged = head.headers.get("Accept-Ranges", "").lower() == "bytes"
+            expected = sha256 or _linked_sha256(head)
+
+            if size and ranged and segments > 1 and size >= DOWNLOAD_SEGMENT_THRESHOLD and not part.exists():
+                bounds = [size * i // segments for i in range(segments + 1)]
+                pieces = [part.with_name(f"{part.name}{i}") for i in range(segments)]
+                with ThreadPoolExecutor(max_workers=segments) as pool:
+                    list(pool.map(
+                        lambda i: _fetch_range(session, url, pieces[i], bounds[i], bounds[i + 1] - 1, timeout),
+                        range(segments),
+                    ))
+                with open(part, "wb") as out:
+                    for piece in pieces:
+                        with open(piece, "rb") as f:
+                            shutil.copyfileobj(f, out, DOWNLOAD_CHUNK_SIZE)
+                for piece in pieces:
+                    piece.unlink()
+            else:
+                for stale in part.parent.glob(f"{part.name}[0-9]*"):
+                    stale.unlink()
+                if part.exists() and not ranged:
+                    part.unlink()
+                # A complete part (left by a crash before the rename) only needs verifying
+                if not (size and part.exists() and part.stat().st_size >= size):
+                    _fetch_range(session, url, part, 0, None, timeout)
+
+            if size and part.stat().st_size != size:
+                received = part.stat().st_size
+                if received > size:
+                    part.unlink()  # cannot be resumed into the right file
+                raise DownloadError(f"size mismatch ({received} != {size} bytes)")
+            if expected and _sha256_of(part) != expected:
+                part.unlink()
+                raise DownloadError("SHA-256 mismatch")
+            os.replace(part, dest)
+            logger.info(f"Downloaded {dest.name}")
+            return str(dest)
+        except Exception as e:
+            logger.warning(f"Download of {dest.name} from {url} failed: {e}")
+            errors.append(f"{url}: {e}")
+    raise DownloadError(f"Could not download {dest.name}: " + "; ".join(errors))
+
+def download_files(jobs: List[dict], max_workers: int = 4) -> List[str]:
+    """Run several :func:`download_file` calls concurrently.
+
+    ``jobs`` holds keyword arguments for :func:`download_file`.  Every job
+    runs to completion; a :class:`DownloadError` listing the failures is
+    raised afterwards if any failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [pool.submit(download_file, **job) for job in jobs]
+    results, errors = [], []
+    for job, future in zip(jobs, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            errors.append(f"{Path(job['dest']).name}: {e}")
+    if errors:
+        raise DownloadError("; ".join(errors))
+    return results
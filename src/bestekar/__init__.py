@@ -6,14 +6,14 @@ Bestekar - Türkçe şarkı sözlerini müziğe dönüştüren AI besteci
 import os
 import sys
 import time
-import torch
 import warnings
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, List, Union
 from abc import ABC, abstractmethod
 import math
 import shutil
-import requests
+import contextlib
+import threading
 from datetime import datetime
 
 try:
@@ -24,23 +24,36 @@ except ImportError:
     pass  # .env loading is optional; continue silently if python-dotenv absent
 
 
-# System tray imports - required for tray functionality
-try:
-    import pystray  # type: ignore
-    from PIL import Image  # type: ignore
-except ImportError:  # pragma: no cover
-    print("❌ System tray dependencies not found. Please install with: uv add pystray pillow")
-    sys.exit(1)
-
-# Import Celery tasks from bestewk module
-from bestewk import (
-    generate_music_task, 
-    open_help_task, 
-    exit_app_task, 
-    get_active_generation_tasks,
-    app_init_task,
-    celery_app
-)
+# Heavy dependencies (torch, Celery via bestewk, RVC/TTS stacks) are imported
+# on first use so the tray icon appears without waiting for them.
+_BESTEWK_EXPORTS = {
+    "generate_music_task",
+    "open_help_task",
+    "exit_app_task",
+    "get_active_generation_tasks",
+    "app_init_task",
+    "celery_app",
+}
+
+def __getattr__(name: str) -> Any:
+    """Resolve lazily imported module attributes (PEP 562)."""
+    if name in _BESTEWK_EXPORTS:
+        import bestewk
+
+        return getattr(bestewk, name)
+    if name == "RVC_AVAILABLE":
+        return rvc_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _load_tray():
+    """Import the system tray dependencies - required for tray functionality."""
+    try:
+        import pystray  # type: ignore
+        from PIL import Image  # type: ignore
+    except ImportError:  # pragma: no cover
+        print("❌ System tray dependencies not found. Please install with: uv add pystray pillow")
+        sys.exit(1)
+    return pystray, Image
 
 # Kivy GUI imports - ONLY LOADED WHEN NEEDED
 # These will be imported only in the main() function to prevent worker from loading GUI
@@ -136,6 +149,7 @@ def _create_kivy_classes():
             self.celery_result = None
             self.task_monitor_event = None
             self.start_time = None
+            self.preview_file = None
             
         def start_celery_task_monitoring(self, task_id: str):
             """Start monitoring a Celery task."""
@@ -144,6 +158,7 @@ def _create_kivy_classes():
                 
             self.celery_task_id = task_id
             from celery.result import AsyncResult
+            from bestewk import celery_app
             self.celery_result = AsyncResult(task_id, app=celery_app)
             
             # Start monitoring task progress
@@ -171,6 +186,10 @@ def _create_kivy_classes():
                         progress = info.get('progress', 0)
                         message = info.get('message', 'Processing...')
                         self.update_progress(progress, message)
+                        preview_file = info.get('preview_file')
+                        if preview_file and preview_file != self.preview_file:
+                            self.preview_file = preview_file
+                            self.add_log(f"🎧 Preview available while generating: {preview_file}")
                 elif state == 'SUCCESS':
                     self.update_progress(100, "Generation completed!")
                     if self.task_monitor_event:
@@ -193,6 +212,7 @@ def _create_kivy_classes():
             try:
                 if self.celery_result:
                     # Revoke the task
+                    from bestewk import celery_app
                     celery_app.control.revoke(self.celery_task_id, terminate=True)
                     self.add_log("🛑 Generation cancelled by user")
                     self.update_progress(0, "Generation cancelled")
@@ -622,20 +642,22 @@ def _create_kivy_classes():
             
             # Submit Celery task
             try:
-                task = celery_app.send_task(
-                    'bestewk.generate_music',
-                    kwargs={
-                        'lyrics_text': lyrics_text,
-                        'style_text': style_text,
-                        'duration': duration,
-                        'rvc_model_path': rvc_model_path,
-                        'mode': generation_mode,
-                    },
+                from bestewk import submit_music_generation, resolve_broker_config
+                
+                # Shared brokers can run the vocal and instrumental stages in parallel
+                task_id = submit_music_generation(
+                    lyrics_text=lyrics_text,
+                    style_text=style_text,
+                    duration=duration,
+                    rvc_model_path=rvc_model_path,
+                    mode=generation_mode,
+                    progressive=True,
+                    pipeline=resolve_broker_config()['multiprocess'],
                 )
                 
                 # Start monitoring the task
-                progress_dialog.start_celery_task_monitoring(task.id)
-                logger.info(f"Submitted music generation task {task.id} to generate_music queue")
+                progress_dialog.start_celery_task_monitoring(task_id)
+                logger.info(f"Submitted music generation task {task_id} to generate_music queue")
                 
             except Exception as e:
                 logger.error(f"Error submitting Celery task: {e}")
@@ -1029,6 +1051,8 @@ def get_gpu_info() -> dict:
     }
     
     try:
+        import torch
+
         if torch.cuda.is_available():
             gpu_count = torch.cuda.device_count()
             if gpu_count > 0:
@@ -1071,6 +1095,190 @@ def get_gpu_info() -> dict:
     
     return gpu_info
 
+# --------------------------------------------------
+# Hardware Profile
+# --------------------------------------------------
+
+HARDWARE_PROFILE_PATH = Path.home() / ".bestekar" / "hardware_profile.json"
+HARDWARE_PROFILE_VERSION = 1
+MUSICGEN_MODELS = ("facebook/musicgen-small", "facebook/musicgen-medium", "facebook/musicgen-large")
+# MusicGen emits 50 EnCodec frames (tokens) per second of audio
+MUSICGEN_TOKENS_PER_SECOND = 50
+
+_hardware_profile: Optional[dict] = None
+
+def _hardware_fingerprint() -> dict:
+    """Cheap identifiers that change when the machine a profile was taken on changes.
+
+    The torch build comes from package metadata and the GPUs from their
+    device nodes, so neither torch nor CUDA is initialized.
+    """
+    import glob
+    import platform
+    from importlib import metadata
+
+    try:
+        import psutil
+        memory_gb = round(psutil.virtual_memory().total / (1024**3), 1)
+    except ImportError:
+        memory_gb = None
+    try:
+        torch_version = metadata.version("torch")
+    except metadata.PackageNotFoundError:
+        torch_version = None
+    return {
+        "version": HARDWARE_PROFILE_VERSION,
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "threads": os.cpu_count(),
+        "memory_gb": memory_gb,
+        "cuda_visible_devices": os.getenv("CUDA_VISIBLE_DEVICES"),
+        "torch": torch_version,
+        "gpu_devices": sorted(glob.glob("/dev/nvidia[0-9]*")),
+    }
+
+def _write_hardware_profile(profile: dict) -> None:
+    import json
+
+    try:
+        HARDWARE_PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Per-process name: prefork workers write the profile concurrently
+        tmp = HARDWARE_PROFILE_PATH.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(profile, indent=2))
+        os.replace(tmp, HARDWARE_PROFILE_PATH)
+    except OSError as e:
+        logger.warning(f"Could not persist hardware profile: {e}")
+
+@contextlib.contextmanager
+def _hardware_profile_lock():
+    """Hold an exclusive, cross-process lock on the hardware profile."""
+    HARDWARE_PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(HARDWARE_PROFILE_PATH.with_suffix(".lock"), "a+b") as handle:
+        if os.name == "nt":
+            import msvcrt
+
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+def _update_throughput(update) -> dict:
+    """Apply *update* to the latest stored throughput table and persist it.
+
+    Other worker processes record measurements too, so the table is re-read
+    from disk under the profile lock instead of trusting this process's copy.
+    """
+    import json
+
+    with _hardware_profile_lock():
+        profile = get_hardware_profile()
+        try:
+            stored = json.loads(HARDWARE_PROFILE_PATH.read_text())
+        except (OSError, ValueError):
+            stored = {}
+        if stored.get("fingerprint") == profile.get("fingerprint"):
+            profile["throughput"] = dict(stored.get("throughput") or {})
+        throughput = profile.setdefault("throughput", {})
+        update(throughput)
+        _write_hardware_profile(profile)
+    return throughput
+
+def get_hardware_profile(refresh: bool = False) -> dict:
+    """Return the machine's hardware profile, probing at most once per process.
+
+    The profile holds ``memory_gb``, ``cpu`` and ``gpu`` as reported by the
+    ``get_*`` probes plus any measured MusicGen ``throughput`` (tokens/sec per
+    model).  It is persisted to ``~/.bestekar/hardware_profile.json`` and
+    reused by later processes as long as the machine fingerprint matches,
+    which also skips CUDA initialization at startup.
+    """
+    global _hardware_profile
+    if _hardware_profile is not None and not refresh:
+        return _hardware_profile
+
+    import json
+
+    fingerprint = _hardware_fingerprint()
+    if not refresh:
+        try:
+            stored = json.loads(HARDWARE_PROFILE_PATH.read_text())
+            if stored.get("fingerprint") == fingerprint:
+                _hardware_profile = stored
+                return stored
+        except (OSError, ValueError):
+            pass
+
+    previous = _hardware_profile or {}
+    profile = {
+        "fingerprint": fingerprint,
+        "memory_gb": get_system_memory_gb(),
+        "cpu": get_cpu_info(),
+        "gpu": get_gpu_info(),
+        # Measurements stay valid while the fingerprint does
+        "throughput": previous.get("throughput", {}) if previous.get("fingerprint") == fingerprint else {},
+        "probed_at": time.time(),
+    }
+    _write_hardware_profile(profile)
+    _hardware_profile = profile
+    return profile
+
+def benchmark_musicgen_throughput(
+    models: Optional[List[str]] = None, seconds: float = 2.0, persist: bool = True
+) -> dict:
+    """Measure MusicGen generation speed in tokens/sec for each model size.
+
+    Each model generates *seconds* of audio after a short warm-up.  Models
+    whose estimated footprint does not fit in available memory are skipped;
+    models that were not already cached are released afterwards.  Results
+    are merged into the hardware profile.
+    """
+    try:
+        import psutil
+        available_gb = psutil.virtual_memory().available / (1024**3)
+    except ImportError:
+        available_gb = None
+
+    profile = get_hardware_profile()
+    registry = get_model_registry()
+    results = {}
+    for name in models or MUSICGEN_MODELS:
+        if available_gb is not None and estimate_generation_footprint_gb(name, int(seconds)) > available_gb:
+            logger.info(f"Skipping throughput benchmark for {name}: not enough free memory")
+            continue
+        cached = registry.is_loaded(name)
+        try:
+            model = registry.get(name)
+            model.set_generation_params(duration=0.2)
+            model.generate(["warm-up"], progress=False)
+            model.set_generation_params(duration=seconds)
+            start = time.perf_counter()
+            model.generate(["benchmark"], progress=False)
+            elapsed = time.perf_counter() - start
+            results[name] = seconds * MUSICGEN_TOKENS_PER_SECOND / max(elapsed, 1e-6)
+            logger.info(f"{name}: {results[name]:.1f} tokens/sec")
+        except Exception as e:
+            logger.warning(f"Throughput benchmark failed for {name}: {e}")
+        finally:
+            if not cached:
+                registry.release(name)
+
+    if persist:
+        _update_throughput(lambda throughput: throughput.update(results))
+    else:
+        profile.setdefault("throughput", {}).update(results)
+    return results
+
 def choose_optimal_musicgen_model() -> str:
     """Choose the best MusicGen model based on system resources."""
     # Check for environment variable override (highest priority)
@@ -1085,43 +1293,281 @@ def choose_optimal_musicgen_model() -> str:
         else:
             logger.warning(f"Invalid BESTEKAR_MODEL environment variable: {env_model}")
     
-    # Get system resources
-    memory_gb = get_system_memory_gb()
-    cpu_info = get_cpu_info()
-    gpu_info = get_gpu_info()
-    
-    # Decision matrix based on resources
+    # Get system resources (probed once per process, see get_hardware_profile)
+    profile = get_hardware_profile()
+    memory_gb = profile["memory_gb"]
+    cpu_info = profile["cpu"]
+    gpu_info = profile["gpu"]
+
+    throughput = profile.get("throughput") or {}
+    if not throughput and os.getenv("BESTEKAR_BENCHMARK_MODELS", "0") in {"1", "true", "True"}:
+        throughput = benchmark_musicgen_throughput()
+
+    # Largest model that keeps up with the required realtime factor when it has
+    # been measured, or that meets the resource thresholds when it has not
+    realtime_factor = float(os.getenv("BESTEKAR_MIN_REALTIME_FACTOR", "0.25"))
+    required = MUSICGEN_TOKENS_PER_SECOND * realtime_factor
+    for model in reversed(MUSICGEN_MODELS):
+        measured = throughput.get(model)
+        if measured is not None:
+            if measured >= required:
+                logger.info(f"Selected model: {model} ({measured:.1f} tokens/sec measured)")
+                return model
+        elif _meets_model_requirements(model, memory_gb, cpu_info, gpu_info):
+            logger.info(f"Selected model: {model} based on system resources")
+            logger.info(f"System: {memory_gb:.1f}GB RAM, {cpu_info['cores']} cores, GPU: {gpu_info['available']}")
+            return model
+
+    if throughput:
+        fastest = max(throughput, key=throughput.get)
+        logger.warning(f"No model reaches {required:.1f} tokens/sec, using fastest measured: {fastest}")
+        return fastest
+
+    # Fallback to small model if nothing else works
+    logger.warning("System resources are very limited, using smallest model")
+    return "facebook/musicgen-small"
+
+def _meets_model_requirements(model: str, memory_gb: float, cpu_info: dict, gpu_info: dict) -> bool:
+    """Static decision matrix used for models without a throughput measurement."""
     model_requirements = {
         "facebook/musicgen-small": {"min_ram": 4, "min_cores": 1, "min_gpu_vram": 0},
         "facebook/musicgen-medium": {"min_ram": 8, "min_cores": 2, "min_gpu_vram": 0},
         "facebook/musicgen-large": {"min_ram": 12, "min_cores": 4, "min_gpu_vram": 0}
     }
-    
-    # Start with the highest quality model and work down
-    for model in ["facebook/musicgen-large", "facebook/musicgen-medium", "facebook/musicgen-small"]:
-        req = model_requirements[model]
-        
-        # Check RAM requirement
-        if memory_gb < req["min_ram"]:
-            continue
-            
-        # Check CPU cores
-        if cpu_info["cores"] < req["min_cores"]:
+    req = model_requirements.get(model)
+    if req is None:
+        return False
+
+    # Check RAM requirement
+    if memory_gb < req["min_ram"]:
+        return False
+
+    # Check CPU cores
+    if cpu_info["cores"] < req["min_cores"]:
+        return False
+
+    # GPU is optional but helpful for large models
+    if model == "facebook/musicgen-large" and not gpu_info["available"]:
+        # Large model on CPU requires more RAM
+        if memory_gb < 16:
+            return False
+
+    return True
+
+# Approximate resident size of each MusicGen checkpoint (LM + EnCodec, fp32)
+MUSICGEN_FOOTPRINT_GB = {
+    "small": 2.0,
+    "medium": 7.0,
+    "large": 14.0,
+}
+
+def estimate_generation_footprint_gb(model_name: Optional[str], duration: int) -> float:
+    """Estimate peak memory of one generation job in GB.
+
+    The model weights dominate; decoding activations for a 30 s window add
+    roughly 15 % on top and the output buffer grows with *duration*.
+    """
+    weights_gb = MUSICGEN_FOOTPRINT_GB[_musicgen_size(model_name)]
+    activations_gb = weights_gb * 0.15
+    # Stereo float32 at 32 kHz, kept once in the output buffer
+    audio_gb = max(duration, 0) * 32000 * 2 * 4 / (1024**3)
+    return weights_gb + activations_gb + audio_gb
+
+# --------------------------------------------------
+# Deadline Planning
+# --------------------------------------------------
+
+# LM cost of two_step_cfg (separate conditional/unconditional passes)
+# relative to batched CFG, which is what the throughput benchmark measures
+TWO_STEP_CFG_COST = 1.6
+# Rough cold-load time of each checkpoint size when it is not cached
+MUSICGEN_LOAD_SECONDS = {
+    "small": 20.0,
+    "medium": 60.0,
+    "large": 120.0,
+}
+
+def _musicgen_size(model_name: Optional[str]) -> str:
+    """Return the checkpoint size key ("small"/"medium"/"large") of *model_name*."""
+    for key in MUSICGEN_FOOTPRINT_GB:
+        if model_name and key in model_name:
+            return key
+    return "medium"
+
+def predict_generation_seconds(
+    model_name: str, duration: int, two_step_cfg: bool = True, throughput: Optional[dict] = None
+) -> Optional[float]:
+    """Predict wall time for *duration* seconds of audio, or None if unmeasured."""
+    if throughput is None:
+        throughput = get_hardware_profile().get("throughput") or {}
+    tokens_per_sec = throughput.get(model_name)
+    if not tokens_per_sec:
+        return None
+    seconds = duration * MUSICGEN_TOKENS_PER_SECOND / tokens_per_sec
+    if two_step_cfg:
+        seconds *= TWO_STEP_CFG_COST
+    if not get_model_registry().is_loaded(model_name):
+        seconds += MUSICGEN_LOAD_SECONDS[_musicgen_size(model_name)]
+    return seconds
+
+def plan_generation(duration: int, deadline_seconds: Optional[float] = None) -> dict:
+    """Choose the model and CFG mode for a request with a latency budget.
+
+    Candidates are tried from the largest model down, each first with
+    ``two_step_cfg`` and then with batched CFG, and the first whose predicted
+    time fits *deadline_seconds* wins.  When nothing fits, the fastest
+    candidate is returned with ``meets_deadline`` False.  Without a deadline
+    or throughput measurements the resource-based choice is used.
+
+    Returns a dict with ``model``, ``overrides`` (generation parameters to
+    apply on top of the defaults), ``predicted_seconds``,
+    ``deadline_seconds`` and ``meets_deadline``.
+    """
+    throughput = get_hardware_profile().get("throughput") or {}
+    if deadline_seconds is None or not throughput:
+        model = choose_optimal_musicgen_model()
+        return {
+            "model": model,
+            "overrides": {},
+            "predicted_seconds": predict_generation_seconds(model, duration, throughput=throughput),
+            "deadline_seconds": deadline_seconds,
+            "meets_deadline": None,
+        }
+
+    candidates = []
+    for model in reversed(MUSICGEN_MODELS):
+        if model not in throughput:
             continue
-            
-        # GPU is optional but helpful for large models
-        if model == "facebook/musicgen-large" and not gpu_info["available"]:
-            # Large model on CPU requires more RAM
-            if memory_gb < 16:
-                continue
-                
-        logger.info(f"Selected model: {model} based on system resources")
-        logger.info(f"System: {memory_gb:.1f}GB RAM, {cpu_info['cores']} cores, GPU: {gpu_info['available']}")
-        return model
-    
-    # Fallback to small model if nothing else works
-    logger.warning("System resources are very limited, using smallest model")
-    return "facebook/musicgen-small"
+        for two_step_cfg in (True, False):
+            predicted = predict_generation_seconds(model, duration, two_step_cfg, throughput)
+            candidates.append((predicted, model, two_step_cfg))
+            if predicted <= deadline_seconds:
+                logger.info(f"Planned {model} (two_step_cfg={two_step_cfg}): ~{predicted:.0f}s of {deadline_seconds:.0f}s budget")
+                return {
+                    "model": model,
+                    "overrides": {"two_step_cfg": two_step_cfg},
+                    "predicted_seconds": predicted,
+                    "deadline_seconds": deadline_seconds,
+                    "meets_deadline": True,
+                }
+
+    predicted, model, two_step_cfg = min(candidates)
+    logger.warning(f"No model fits {deadline_seconds:.0f}s for {duration}s of audio, fastest is {model} at ~{predicted:.0f}s")
+    return {
+        "model": model,
+        "overrides": {"two_step_cfg": two_step_cfg},
+        "predicted_seconds": predicted,
+        "deadline_seconds": deadline_seconds,
+        "meets_deadline": False,
+    }
+
+def record_generation_throughput(model_name: str, duration: int, elapsed: float, two_step_cfg: bool = True) -> None:
+    """Fold an observed generation into the profile's tokens/sec for *model_name*."""
+    if elapsed <= 0 or duration <= 0:
+        return
+    observed = duration * MUSICGEN_TOKENS_PER_SECOND / elapsed
+    if two_step_cfg:
+        observed *= TWO_STEP_CFG_COST  # normalize to batched-CFG speed
+
+    def _fold(throughput: dict) -> None:
+        previous = throughput.get(model_name)
+        # Exponential moving average keeps one slow run from dominating
+        throughput[model_name] = observed if previous is None else 0.7 * previous + 0.3 * observed
+
+    _update_throughput(_fold)
+
+# --------------------------------------------------
+# CFG Profiles
+# --------------------------------------------------
+
+# Classifier-free guidance settings applied on top of the per-model defaults.
+# "quality" runs the conditional and unconditional passes separately,
+# "fast" batches them into one forward.
+CFG_PROFILES = {
+    "quality": {"two_step_cfg": True},
+    "fast": {"two_step_cfg": False},
+}
+
+def get_cfg_profile(name: Optional[str] = None) -> dict:
+    """Return the generation overrides of CFG profile *name*.
+
+    Defaults to ``BESTEKAR_CFG_PROFILE`` (``quality``); unknown names fall
+    back to ``quality`` with a warning.
+    """
+    name = (name or os.getenv("BESTEKAR_CFG_PROFILE", "quality")).lower()
+    if name not in CFG_PROFILES:
+        logger.warning(f"Unknown CFG profile {name!r}, using 'quality'")
+        name = "quality"
+    return dict(CFG_PROFILES[name])
+
+def _spectral_profile(waveform):
+    """Mean log-magnitude spectrum of a ``[channels, samples]`` waveform."""
+    import torch
+
+    mono = waveform.float().mean(dim=0)
+    window = torch.hann_window(2048, device=mono.device)
+    spec = torch.stft(mono, n_fft=2048, hop_length=512, window=window, return_complex=True)
+    return torch.log1p(spec.abs()).mean(dim=1)
+
+def benchmark_cfg_profiles(
+    model_name: Optional[str] = None,
+    seconds: float = 10.0,
+    profiles: Optional[List[str]] = None,
+    seed: int = 0,
+    instrumental: bool = True,
+) -> List[dict]:
+    """Time each CFG profile and compare its output with the first one.
+
+    Every profile generates *seconds* of audio from the same prompt and
+    *seed* after a short warm-up.  Returns one dict per profile with
+    ``profile``, ``seconds`` (wall time), ``tokens_per_sec``, ``speedup``
+    relative to the first profile and ``similarity``: the cosine similarity
+    of the mean log-magnitude spectra, 1.0 for the reference.  Sampling
+    makes runs diverge token by token, so similarity measures how close the
+    overall timbre and balance stay rather than sample-level equality.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    generator = TurkishSongGenerator(model_name)
+    if not generator.setup_model():
+        return []
+    model = generator.model
+    description = generator._build_description("Turkish emotional pop ballad", instrumental)
+
+    model.set_generation_params(duration=0.2)
+    model.generate(["warm-up"], progress=False)
+
+    results: List[dict] = []
+    reference = None
+    for name in profiles or list(CFG_PROFILES):
+        generator.cfg_profile = name
+        params = generator._generation_params(seconds, instrumental)
+        model.set_generation_params(**params)
+        torch.manual_seed(seed)
+        start = time.perf_counter()
+        if seconds > 30:
+            # Same chunked path as generate_song, so the profile is re-applied per segment
+            waveform = _safe_generate(model, description, int(seconds), checkpoint=False, params=params)[0]
+        else:
+            waveform = model.generate([description], progress=False)[0]
+        elapsed = time.perf_counter() - start
+
+        spectrum = _spectral_profile(waveform)
+        if reference is None:
+            reference = (spectrum, elapsed)
+        results.append({
+            "profile": name,
+            "seconds": elapsed,
+            "tokens_per_sec": seconds * MUSICGEN_TOKENS_PER_SECOND / max(elapsed, 1e-6),
+            "speedup": reference[1] / max(elapsed, 1e-6),
+            "similarity": F.cosine_similarity(spectrum, reference[0], dim=0).item(),
+        })
+        logger.info(
+            f"CFG profile {name}: {elapsed:.1f}s, {results[-1]['speedup']:.2f}x, "
+            f"similarity {results[-1]['similarity']:.3f}"
+        )
+    return results
 
 def install_requirements():
     """Gerekli kütüphaneleri kontrol et ve yükle"""
@@ -1136,194 +1582,873 @@ def install_requirements():
         return False
 
 # --------------------------------------------------
-# Generator abstraction
+# MusicGen Model Registry
 # --------------------------------------------------
 
-class BaseSongGenerator(ABC):
-    """Abstract base class for language-specific song generators."""
+def _estimate_model_size_gb(model) -> float:
+    """Estimate the in-memory size of a MusicGen instance from its parameters."""
+    total_bytes = 0
+    for attr in ("lm", "compression_model"):
+        module = getattr(model, attr, None)
+        if module is None or not hasattr(module, "parameters"):
+            continue
+        try:
+            total_bytes += sum(p.numel() * p.element_size() for p in module.parameters())
+            # Dynamically quantized Linear layers keep packed weights outside parameters()
+            for sub in module.modules():
+                if hasattr(sub, "_packed_params") and callable(getattr(sub, "weight", None)):
+                    weight = sub.weight()
+                    total_bytes += weight.numel() * weight.element_size()
+        except Exception:
+            pass
+    return total_bytes / (1024**3)
 
-    @abstractmethod
-    def setup_model(self) -> bool:  # pragma: no cover
-        """Download / load model weights. Return True on success."""
+class MusicGenRegistry:
+    """Process-wide cache of loaded MusicGen models keyed by model name.
 
-    @abstractmethod
-    def generate_song(
-        self,
-        lyrics: str,
-        style: str,
-        duration: int = 180,
-        output_name: Optional[str] = None,
-        instrumental: bool = False,
-    ) -> Optional[str]:  # pragma: no cover
-        """Generate a song file and return its path or None on error."""
+    Loading a MusicGen checkpoint takes minutes, so workers keep recently used
+    models in memory and hand the same instance to every generator.  Entries
+    are evicted least-recently-used first when either *max_models* or the
+    *memory_budget_gb* would be exceeded.
+    """
 
-# --------------------------------------------------
-# Turkish implementation
-# --------------------------------------------------
+    def __init__(self, max_models: int = 1, memory_budget_gb: Optional[float] = None):
+        import threading
+        from collections import OrderedDict
 
-class TurkishSongGenerator(BaseSongGenerator):
-    def __init__(self, model_name: Optional[str] = None):
-        # System resource-aware model selection for optimal performance
-        import platform
+        self.max_models = max(1, max_models)
+        self.memory_budget_gb = memory_budget_gb
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: dict = {}
+        self._lock = threading.RLock()
+        self._load_locks: dict = {}
 
-        if model_name is None:
-            # Automatically choose the best model based on system resources
-            model_name = choose_optimal_musicgen_model()
-            logger.info(f"Auto-selected model based on system resources: {model_name}")
-        elif "/" not in model_name:
-            # Add facebook prefix if not provided
-            model_name = f"facebook/musicgen-{model_name}"
+    def is_loaded(self, model_name: str) -> bool:
+        """Return True if *model_name* is already resident in the cache."""
+        with self._lock:
+            return model_name in self._models
 
-        self.requested_model = model_name
-        self.model: Any = None  # MusicGen instance
-        
-    def setup_model(self):
-        """MusicGen modelini kurar"""
-        if not install_requirements():
+    def get(self, model_name: str):
+        """Return the cached model for *model_name*, loading it on first use."""
+        import threading
+
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                logger.debug("MusicGen model served from cache", model=model_name)
+                return self._models[model_name]
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # Serialize loads per model so concurrent callers don't load twice
+        with load_lock:
+            with self._lock:
+                if model_name in self._models:
+                    self._models.move_to_end(model_name)
+                    return self._models[model_name]
+
+            model = load_musicgen(model_name)
+            size_gb = _estimate_model_size_gb(model)
+
+            with self._lock:
+                self._evict_for(size_gb)
+                self._models[model_name] = model
+                self._sizes[model_name] = size_gb
+            logger.info("MusicGen model cached", model=model_name, size=f"{size_gb:.2f}GB")
+            return model
+
+    def release(self, model_name: str) -> bool:
+        """Drop *model_name* from the cache. Return True if it was resident."""
+        with self._lock:
+            model = self._models.pop(model_name, None)
+            self._sizes.pop(model_name, None)
+        if model is None:
             return False
+        del model
+        _free_torch_memory()
+        logger.info("MusicGen model released", model=model_name)
+        return True
+
+    def clear(self) -> None:
+        """Release every cached model."""
+        with self._lock:
+            names = list(self._models)
+        for name in names:
+            self.release(name)
+
+    def stats(self) -> dict:
+        """Return a snapshot of cached models and their estimated sizes."""
+        with self._lock:
+            return {
+                "models": list(self._models),
+                "sizes_gb": dict(self._sizes),
+                "total_gb": sum(self._sizes.values()),
+                "max_models": self.max_models,
+                "memory_budget_gb": self.memory_budget_gb,
+            }
+
+    def _evict_for(self, incoming_gb: float) -> None:
+        """Evict LRU entries until *incoming_gb* fits the configured limits."""
+        while self._models:
+            over_count = len(self._models) >= self.max_models
+            over_budget = (
+                self.memory_budget_gb is not None
+                and sum(self._sizes.values()) + incoming_gb > self.memory_budget_gb
+            )
+            if not (over_count or over_budget):
+                break
+            name, _ = self._models.popitem(last=False)
+            self._sizes.pop(name, None)
+            logger.info("Evicting MusicGen model from cache", model=name)
+        _free_torch_memory()
+
+def _free_torch_memory() -> None:
+    """Return cached allocator memory after a model has been dropped."""
+    import gc
+
+    gc.collect()
+    torch = sys.modules.get("torch")  # nothing to free if torch was never loaded
+    try:
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+_model_registry: Optional[MusicGenRegistry] = None
+
+def get_model_registry() -> MusicGenRegistry:
+    """Return the process-wide MusicGen registry, creating it on first use.
+
+    Limits can be tuned with ``BESTEKAR_MODEL_CACHE_SIZE`` (number of models)
+    and ``BESTEKAR_MODEL_CACHE_GB`` (memory budget in GB).
+    """
+    global _model_registry
+    if _model_registry is None:
         try:
-            # Suppress warnings during model loading
-            import warnings
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=UserWarning)
-                warnings.filterwarnings("ignore", message=".*xFormers.*")
-                warnings.filterwarnings("ignore", message=".*FFmpeg.*")
-                
-                from audiocraft.models import MusicGen  # type: ignore
-                logger.info("Model yüklemesi başlıyor", model=self.requested_model)
-                
-                # Show user-friendly message
-                print(f"🔄 Loading {self.requested_model} model (this may take a few minutes)...")
-                
-                self.model = MusicGen.get_pretrained(self.requested_model)  # type: ignore
-                self.model.set_generation_params(
-                    duration=180,
-                    temperature=1.0,
-                    top_k=250,
-                    top_p=0.0,
-                    cfg_coef=3.0,
-                    # Enable compression for better memory efficiency
-                    use_sampling=True,
-                    two_step_cfg=True
-                )
-                
-            logger.success("Model başarıyla yüklendi", model=self.requested_model)
-            print(f"✅ Model loaded successfully!")
-            return True
-        except Exception as e:
-            logger.exception("Model yüklenirken hata", error=str(e))
-            print(f"❌ Failed to load model: {str(e)}")
-            return False
-    
-    def generate_song(self, lyrics, style="Turkish emotional pop ballad WITH FEMALE VOCALS, acoustic guitar, piano", duration=180, output_name=None, instrumental: bool = False):
-        """Şarkı üretir"""
-        if not self.model and not self.setup_model():
-            return None
-        
+            max_models = int(os.getenv("BESTEKAR_MODEL_CACHE_SIZE", "1"))
+        except ValueError:
+            max_models = 1
+        budget_env = os.getenv("BESTEKAR_MODEL_CACHE_GB")
         try:
-            from audiocraft.data.audio import audio_write
-            
-            # Enhanced vocal prompts for better vocal generation
-            if instrumental:
-                description = f"{style}, instrumental, no vocals, beautiful Turkish melody"
-            else:
-                # More specific vocal descriptions for better results
-                vocal_keywords = [
-                    "WITH CLEAR FEMALE VOCALS",
-                    "singing in Turkish",
-                    "expressive voice",
-                    "melodic vocals",
-                    "beautiful voice"
-                ]
-                
-                # Add vocal keywords if not already present
-                style_enhanced = style
-                if not any(keyword.lower() in style.lower() for keyword in ["vocal", "sing", "voice"]):
-                    style_enhanced += f", {vocal_keywords[0]}, {vocal_keywords[1]}"
-                
-                description = f"{style_enhanced}, beautiful Turkish melody with emotional singing"
-            
-            logger.info("Şarkı üretimi başladı", instrumental=instrumental, duration=duration)
-            print(f"🎼 Şarkı üretiliyor...")
-            print(f"📝 Sözler: {len(lyrics)} karakter")
-            print(f"🎨 Stil: {description}")
-            print(f"🎤 Enstrümantal: {'Evet' if instrumental else 'Hayır'}")
-            print(f"⏱️  Süre: {duration} saniye")
-            print(f"🔧 Model: {self.requested_model}")
-            
-            # Model recommendations based on auto-selected model
-            if not instrumental and "small" in self.requested_model:
-                print("🎵 Using small model - optimized for your system resources")
-                print("💡 Tip: For better quality, consider upgrading RAM or using GPU acceleration")
-            elif not instrumental and "medium" in self.requested_model:
-                print("🎵 Using medium model - balanced quality and performance for your system")
-                print("💡 Good balance of quality and resource usage")
-            elif not instrumental and "large" in self.requested_model:
-                print("🎯 Using LARGE model - your system has excellent resources!")
-                print("🎤 Best vocal quality with optimal performance")
-            
-            # Dynamic parameters optimized for the selected model
-            if not instrumental:
-                # Adjust parameters based on model size for optimal performance
-                if "large" in self.requested_model:
-                    self.model.set_generation_params(
-                        duration=duration,
-                        temperature=1.1,  # Higher creativity for large model
-                        top_k=300,  # More diverse sampling with large model
-                        top_p=0.95,  # Better nucleus sampling for vocals
-                        cfg_coef=5.0,  # Higher guidance for better prompt following
-                        use_sampling=True,
-                        two_step_cfg=True  # Better quality with large model
-                    )
-                else:
-                    self.model.set_generation_params(
-                        duration=duration,
-                        temperature=1.0,  # Standard creativity for smaller models
-                        top_k=250,  # Balanced sampling
-                        top_p=0.9,  # Good nucleus sampling
-                        cfg_coef=4.0,  # Balanced guidance
-                        use_sampling=True,
-                        two_step_cfg=True
-                    )
-            else:
-                # Instrumental parameters adjusted for model size
-                if "large" in self.requested_model:
-                    self.model.set_generation_params(
-                        duration=duration,
-                        temperature=1.0,  # Balanced creativity for instrumental
-                        top_k=300,
-                        top_p=0.85,  # Good nucleus sampling for instrumental variety
-                        cfg_coef=4.0,  # Optimized guidance for large model
-                        use_sampling=True,
-                        two_step_cfg=True
-                    )
-                else:
-                    self.model.set_generation_params(
-                        duration=duration,
-                        temperature=0.9,  # Slightly lower for smaller models
-                        top_k=250,
-                        top_p=0.8,  # Conservative sampling
-                        cfg_coef=3.5,  # Lower guidance for efficiency
+            budget_gb = float(budget_env) if budget_env else None
+        except ValueError:
+            budget_gb = None
+        _model_registry = MusicGenRegistry(max_models=max_models, memory_budget_gb=budget_gb)
+    return _model_registry
+
+# --------------------------------------------------
+# Compiled Weights
+# --------------------------------------------------
+
+# Converted model weights, keyed by model name
+MUSICGEN_WEIGHTS_DIR = Path(os.getenv("BESTEKAR_WEIGHTS_DIR", str(Path.home() / ".bestekar" / "weights")))
+COMPILED_WEIGHTS_VERSION = 1
+
+def compiled_weights_enabled() -> bool:
+    """Return True unless ``BESTEKAR_COMPILED_WEIGHTS`` disables the store."""
+    return os.getenv("BESTEKAR_COMPILED_WEIGHTS", "1") in {"1", "true", "True"}
+
+def _musicgen_device(device: Optional[str] = None) -> str:
+    """Resolve *device* the way ``MusicGen.get_pretrained`` does."""
+    if device is not None:
+        return device
+    import torch
+
+    return "cuda" if torch.cuda.device_count() else "cpu"
+
+def _compiled_weights_dir(model_name: str, device: str) -> Path:
+    """Base name of the store; builds live in ``<base>@<version>`` directories."""
+    # audiocraft loads the LM in float32 on CPU and float16 elsewhere
+    dtype = "float32" if device == "cpu" else "float16"
+    return MUSICGEN_WEIGHTS_DIR / f"{model_name.replace('/', '--')}.{device}-{dtype}"
+
+def _compiled_weights_pointer(base: Path) -> Path:
+    # Names the build directory currently in use
+    return base.with_name(f"{base.name}.current")
+
+def _current_compiled_weights(base: Path) -> Optional[Path]:
+    """Return the build directory the store's pointer names, if any."""
+    try:
+        name = _compiled_weights_pointer(base).read_text().strip()
+    except OSError:
+        return None
+    return base.with_name(name) if name.startswith(f"{base.name}@") else None
+
+def _compiled_weights_builds(base: Path) -> List[Path]:
+    """Finished build directories of the store, oldest first."""
+    import re
+
+    builds = []
+    for path in base.parent.glob(f"{base.name}@*"):
+        match = re.fullmatch(r"(\d+)-\d+", path.name[len(base.name) + 1:])
+        if match and path.is_dir():
+            builds.append((int(match.group(1)), path))
+    return [path for _, path in sorted(builds)]
+
+def _compiled_weights_versions() -> dict:
+    import torch
+    import audiocraft  # type: ignore
+
+    return {
+        "version": COMPILED_WEIGHTS_VERSION,
+        "torch": torch.__version__,
+        "audiocraft": audiocraft.__version__,
+    }
+
+_SKIPPED_INIT_FNS = (
+    "uniform_", "normal_", "trunc_normal_", "kaiming_uniform_",
+    "kaiming_normal_", "xavier_uniform_", "xavier_normal_",
+)
+_skip_init_lock = threading.Lock()
+_skip_init_local = threading.local()
+_skip_init_users = 0
+_skip_init_saved: dict = {}
+
+def _init_unless_skipping(original):
+    def init(tensor, *args, **kwargs):
+        if getattr(_skip_init_local, "depth", 0):
+            return tensor
+        return original(tensor, *args, **kwargs)
+    return init
+
+@contextlib.contextmanager
+def _skip_weight_init():
+    """Make ``torch.nn.init`` a no-op in this thread while building modules whose weights get replaced.
+
+    The patched initializers defer to the originals on every other thread,
+    so modules built concurrently elsewhere (GUI, RVC) are still
+    initialized; the lock keeps concurrent loads from restoring them early.
+    """
+    global _skip_init_users
+    import torch
+
+    with _skip_init_lock:
+        if _skip_init_users == 0:
+            for name in _SKIPPED_INIT_FNS:
+                _skip_init_saved[name] = getattr(torch.nn.init, name)
+                setattr(torch.nn.init, name, _init_unless_skipping(_skip_init_saved[name]))
+        _skip_init_users += 1
+    _skip_init_local.depth = getattr(_skip_init_local, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _skip_init_local.depth -= 1
+        with _skip_init_lock:
+            _skip_init_users -= 1
+            if _skip_init_users == 0:
+                for name, fn in _skip_init_saved.items():
+                    setattr(torch.nn.init, name, fn)
+                _skip_init_saved.clear()
+
+def save_compiled_musicgen(model_name: str, model, device: str) -> Optional[Path]:
+    """Write *model*'s LM and compression weights as safetensors for fast loading.
+
+    Tensors are stored in the dtype they were loaded in, next to a
+    ``config.json`` with the configs needed to rebuild the modules.  Each
+    build goes to a fresh ``<base>@<version>`` directory and is published by
+    atomically replacing the ``<base>.current`` pointer, so workers loading
+    the previous build never see files disappear underneath them.
+    Returns the build directory, or None if it could not be written.
+    """
+    import json
+
+    try:
+        from safetensors.torch import save_file
+        from omegaconf import OmegaConf
+        from audiocraft.models.loaders import load_compression_model_ckpt  # type: ignore
+    except ImportError as e:
+        logger.debug(f"Compiled weights unavailable: {e}")
+        return None
+
+    base = _compiled_weights_dir(model_name, device)
+    target = base.with_name(f"{base.name}@{time.time_ns()}-{os.getpid()}")
+    tmp = target.with_name(f"{target.name}.tmp")
+    try:
+        pkg = load_compression_model_ckpt(model_name)
+        if "pretrained" in pkg:
+            compression = {"pretrained": pkg["pretrained"]}
+        else:
+            compression = {"cfg": OmegaConf.to_container(OmegaConf.create(pkg["xp.cfg"]))}
+        del pkg
+
+        tmp.mkdir(parents=True, exist_ok=True)
+        save_file({k: v.contiguous() for k, v in model.lm.state_dict().items()}, str(tmp / "lm.safetensors"))
+        if "cfg" in compression:
+            save_file(
+                {k: v.contiguous() for k, v in model.compression_model.state_dict().items()},
+                str(tmp / "compression.safetensors"),
+            )
+        config = {
+            **_compiled_weights_versions(),
+            "revision": _musicgen_checkpoint_revision(model_name),
+            "lm": OmegaConf.to_container(model.lm.cfg),
+            "compression": compression,
+        }
+        (tmp / "config.json").write_text(json.dumps(config, indent=2))
+        os.replace(tmp, target)
+
+        previous = _current_compiled_weights(base)
+        pointer = _compiled_weights_pointer(base)
+        pointer_tmp = pointer.with_name(f"{pointer.name}.{os.getpid()}.tmp")
+        pointer_tmp.write_text(target.name)
+        os.replace(pointer_tmp, pointer)
+        logger.info("Compiled weights saved", model=model_name, path=str(target))
+
+        # The build just replaced may still be loading elsewhere; only older ones go
+        for build in _compiled_weights_builds(base):
+            if previous is None or build in (previous, target):
+                break
+            shutil.rmtree(build, ignore_errors=True)
+        # Unversioned store written by earlier releases
+        shutil.rmtree(base, ignore_errors=True)
+        return target
+    except Exception as e:
+        logger.warning(f"Could not save compiled weights for {model_name}: {e}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        return None
+
+def _read_compiled_config(target: Optional[Path], model_name: str) -> Optional[dict]:
+    """Config of a compiled build, or None if missing or from another checkpoint or library versions."""
+    import json
+
+    if target is None:
+        return None
+    try:
+        config = json.loads((target / "config.json").read_text())
+    except (OSError, ValueError):
+        return None
+    if {k: config.get(k) for k in ("version", "torch", "audiocraft")} != _compiled_weights_versions():
+        logger.info("Compiled weights are from other library versions, rebuilding", model=model_name)
+        return None
+    # An unresolvable revision (e.g. cleared hub cache) is not evidence of a change
+    revision = _musicgen_checkpoint_revision(model_name)
+    if revision is not None and config.get("revision") != revision:
+        logger.info("Compiled weights are from another checkpoint, rebuilding", model=model_name)
+        return None
+    return config
+
+def _build_compiled_compression(target: Path, compression: dict, device: str):
+    """Rebuild the compression model recorded in a compiled build."""
+    from safetensors.torch import load_file
+    from omegaconf import OmegaConf
+    from audiocraft.models import builders  # type: ignore
+    from audiocraft.models.encodec import CompressionModel  # type: ignore
+
+    if "pretrained" in compression:
+        return CompressionModel.get_pretrained(compression["pretrained"], device=device)
+    compression_cfg = OmegaConf.create(compression["cfg"])
+    compression_cfg.device = device
+    with _skip_weight_init():
+        compression_model = builders.get_compression_model(compression_cfg)
+    compression_model.load_state_dict(
+        load_file(str(target / "compression.safetensors"), device=device), assign=True
+    )
+    compression_model.eval()
+    return compression_model
+
+def _load_compiled_compression(model_name: str, device: str):
+    """Compression model from the compiled weights store, or None if unusable."""
+    if not compiled_weights_enabled():
+        return None
+    target = _current_compiled_weights(_compiled_weights_dir(model_name, device))
+    try:
+        config = _read_compiled_config(target, model_name)
+        return _build_compiled_compression(target, config["compression"], device) if config else None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable compiled weights {target}: {e}")
+        return None
+
+def _load_compiled_musicgen(model_name: str, device: str):
+    """Build MusicGen from the compiled weights store, or return None if unusable.
+
+    Modules are built without weight initialization and then take the
+    memory-mapped tensors as their parameters, so CPU workers share the
+    page cache instead of holding private copies.
+    """
+    target = _current_compiled_weights(_compiled_weights_dir(model_name, device))
+    if target is None or not (target / "config.json").exists():
+        return None
+    try:
+        from safetensors.torch import load_file
+        from omegaconf import OmegaConf
+        from audiocraft.models import MusicGen, builders  # type: ignore
+    except ImportError:
+        return None
+
+    try:
+        config = _read_compiled_config(target, model_name)
+        if config is None:
+            return None
+
+        start = time.perf_counter()
+        lm_cfg = OmegaConf.create(config["lm"])
+        with _skip_weight_init():
+            lm = builders.get_lm_model(lm_cfg)
+        lm.load_state_dict(load_file(str(target / "lm.safetensors"), device=device), assign=True)
+        lm.eval()
+        lm.cfg = lm_cfg
+
+        compression_model = _build_compiled_compression(target, config["compression"], device)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable compiled weights {target}: {e}")
+        return None
+
+    # Same melody-conditioner setup as MusicGen.get_pretrained
+    if "self_wav" in lm.condition_provider.conditioners:
+        lm.condition_provider.conditioners["self_wav"].match_len_on_eval = True
+        lm.condition_provider.conditioners["self_wav"]._use_masking = False
+    logger.info("Loaded compiled weights", model=model_name, seconds=f"{time.perf_counter() - start:.1f}")
+    return MusicGen(model_name, compression_model, lm)
+
+def _pretrained_musicgen(model_name: str, device: Optional[str] = None):
+    """Load *model_name* from the compiled weights store, compiling it on first use."""
+    from audiocraft.models import MusicGen  # type: ignore
+
+    device = _musicgen_device(device)
+    if not compiled_weights_enabled():
+        return MusicGen.get_pretrained(model_name, device=device)  # type: ignore
+
+    model = _load_compiled_musicgen(model_name, device)
+    if model is not None:
+        return model
+    model = MusicGen.get_pretrained(model_name, device=device)  # type: ignore
+    save_compiled_musicgen(model_name, model, device)
+    return model
+
+def load_musicgen(model_name: str):
+    """Load *model_name* for the model registry.
+
+    Weights come from the compiled store (see ``save_compiled_musicgen``)
+    when possible.  With ``BESTEKAR_QUANTIZE_CPU`` set the LM is quantized
+    to int8 and that quantized LM is cached as well.
+    """
+    if not cpu_quantization_enabled():
+        return _pretrained_musicgen(model_name)
+
+    model = _load_quantized_musicgen(model_name)
+    if model is not None:
+        logger.info("Loaded cached int8 MusicGen LM", model=model_name)
+        return model
+    model = _pretrained_musicgen(model_name, device="cpu")
+    quantize_musicgen_lm(model.lm)
+    _save_quantized_lm(model_name, model.lm)
+    return model
+
+# --------------------------------------------------
+# CPU Quantization
+# --------------------------------------------------
+
+def cpu_quantization_enabled() -> bool:
+    """Return True if int8 CPU inference is requested and no GPU is present."""
+    if os.getenv("BESTEKAR_QUANTIZE_CPU", "0") not in {"1", "true", "True"}:
+        return False
+    import torch
+
+    if torch.cuda.is_available():
+        logger.info("BESTEKAR_QUANTIZE_CPU ignored: CUDA is available")
+        return False
+    return True
+
+def quantize_musicgen_lm(lm):
+    """Apply dynamic int8 quantization to the Linear layers of a MusicGen LM in place.
+
+    Covers the feed-forward and attention output projections of the
+    transformer and the per-codebook output heads.  Fused attention input
+    projections are used as raw weights by audiocraft and stay float32.
+    """
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    quantize_dynamic(lm.transformer, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    quantize_dynamic(lm.linears, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return lm
+
+def _quantized_lm_path(model_name: str) -> Path:
+    return MUSICGEN_WEIGHTS_DIR / f"{model_name.replace('/', '--')}.lm-int8.pt"
+
+def _musicgen_checkpoint_revision(model_name: str) -> Optional[str]:
+    """Identify the LM checkpoint *model_name* currently resolves to, if known.
+
+    Hub models report the snapshot commit of their cached ``state_dict.bin``;
+    local directories report the file's size and modification time.
+    """
+    local = Path(model_name) / "state_dict.bin"
+    if local.is_file():
+        stat = local.stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return None
+    cached = try_to_load_from_cache(model_name, "state_dict.bin")
+    # .../snapshots/<commit>/state_dict.bin
+    return Path(cached).parent.name if isinstance(cached, str) else None
+
+def _quantized_lm_key(model_name: str) -> dict:
+    """What a cached quantized LM must have been built from to be reused."""
+    return {**_compiled_weights_versions(), "revision": _musicgen_checkpoint_revision(model_name)}
+
+def _save_quantized_lm(model_name: str, lm) -> None:
+    """Persist a quantized LM with the config needed to rebuild it."""
+    import torch
+    from omegaconf import OmegaConf
+
+    path = _quantized_lm_path(model_name)
+    # Workers quantizing the same model concurrently each write their own file
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save(
+            {"key": _quantized_lm_key(model_name), "cfg": OmegaConf.to_container(lm.cfg), "state": lm.state_dict()},
+            tmp,
+        )
+        os.replace(tmp, path)
+        logger.info("Quantized LM saved", model=model_name, path=str(path))
+    except Exception as e:
+        logger.warning(f"Could not cache quantized LM for {model_name}: {e}")
+        tmp.unlink(missing_ok=True)
+
+def _load_quantized_musicgen(model_name: str):
+    """Build MusicGen from a cached quantized LM, or return None if unusable.
+
+    The cache is reused only when torch, audiocraft and the checkpoint
+    revision match the ones it was built from.  The compression model comes
+    from the compiled weights store when it has a usable build.
+    """
+    path = _quantized_lm_path(model_name)
+    if not path.exists():
+        return None
+
+    import torch
+    from omegaconf import OmegaConf
+    from audiocraft.models import MusicGen, builders  # type: ignore
+    from audiocraft.models.loaders import load_compression_model  # type: ignore
+
+    try:
+        # Packed int8 weights are pickled objects, not plain tensors
+        pkg = torch.load(path, map_location="cpu", weights_only=False)
+        key = _quantized_lm_key(model_name)
+        stored = pkg.get("key") or {}
+        # An unresolvable revision (e.g. cleared hub cache) is not evidence of a change
+        if key["revision"] is None:
+            stored = {**stored, "revision": None}
+        if stored != key:
+            logger.info("Quantized LM cache is from another checkpoint or library version, rebuilding", model=model_name)
+            return None
+        cfg = OmegaConf.create(pkg["cfg"])
+        with _skip_weight_init():
+            lm = quantize_musicgen_lm(builders.get_lm_model(cfg))
+        lm.load_state_dict(pkg["state"])
+        lm.eval()
+        lm.cfg = cfg
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable quantized LM cache {path}: {e}")
+        return None
+    compression_model = _load_compiled_compression(model_name, "cpu")
+    if compression_model is None:
+        compression_model = load_compression_model(model_name, device="cpu")
+    return MusicGen(model_name, compression_model, lm)
+
+def benchmark_quantized_musicgen(model_name: Optional[str] = None, seconds: float = 10.0, seed: int = 0) -> dict:
+    """Compare float32 and int8 MusicGen on CPU for speed, size and output.
+
+    Generates *seconds* of audio from the same prompt and *seed* with the
+    float32 checkpoint, quantizes the LM in place and generates again.
+    Returns ``fp32`` and ``int8`` entries (``seconds``, ``tokens_per_sec``,
+    ``size_gb``) plus ``speedup``, ``size_ratio`` and ``similarity`` (cosine
+    similarity of the mean log-magnitude spectra).
+    """
+    import torch
+    import torch.nn.functional as F
+
+    model_name = model_name or choose_optimal_musicgen_model()
+    model = _pretrained_musicgen(model_name, device="cpu")
+    description = TurkishSongGenerator(model_name)._build_description("Turkish emotional pop ballad", True)
+
+    def run() -> tuple:
+        model.set_generation_params(duration=0.2)
+        model.generate(["warm-up"], progress=False)
+        model.set_generation_params(duration=seconds)
+        torch.manual_seed(seed)
+        start = time.perf_counter()
+        waveform = model.generate([description], progress=False)[0]
+        elapsed = time.perf_counter() - start
+        return _spectral_profile(waveform), {
+            "seconds": elapsed,
+            "tokens_per_sec": seconds * MUSICGEN_TOKENS_PER_SECOND / max(elapsed, 1e-6),
+            "size_gb": _estimate_model_size_gb(model),
+        }
+
+    reference, fp32 = run()
+    quantize_musicgen_lm(model.lm)
+    spectrum, int8 = run()
+    result = {
+        "model": model_name,
+        "fp32": fp32,
+        "int8": int8,
+        "speedup": fp32["seconds"] / max(int8["seconds"], 1e-6),
+        "size_ratio": int8["size_gb"] / max(fp32["size_gb"], 1e-9),
+        "similarity": F.cosine_similarity(spectrum, reference, dim=0).item(),
+    }
+    logger.info(
+        f"{model_name} int8: {result['speedup']:.2f}x faster, {result['size_ratio']:.2f}x size, "
+        f"similarity {result['similarity']:.3f}"
+    )
+    return result
+
+# --------------------------------------------------
+# Generator abstraction
+# --------------------------------------------------
+
+class BaseSongGenerator(ABC):
+    """Abstract base class for language-specific song generators."""
+
+    @abstractmethod
+    def setup_model(self) -> bool:  # pragma: no cover
+        """Download / load model weights. Return True on success."""
+
+    @abstractmethod
+    def generate_song(
+        self,
+        lyrics: str,
+        style: str,
+        duration: int = 180,
+        output_name: Optional[str] = None,
+        instrumental: bool = False,
+    ) -> Optional[str]:  # pragma: no cover
+        """Generate a song file and return its path or None on error."""
+
+# --------------------------------------------------
+# Turkish implementation
+# --------------------------------------------------
+
+class TurkishSongGenerator(BaseSongGenerator):
+    def __init__(self, model_name: Optional[str] = None, cfg_profile: Optional[str] = None):
+        # System resource-aware model selection for optimal performance
+        import platform
+
+        if model_name is None:
+            # Automatically choose the best model based on system resources
+            model_name = choose_optimal_musicgen_model()
+            logger.info(f"Auto-selected model based on system resources: {model_name}")
+        elif "/" not in model_name:
+            # Add facebook prefix if not provided
+            model_name = f"facebook/musicgen-{model_name}"
+
+        self.requested_model = model_name
+        # CFG profile name (see CFG_PROFILES); None follows BESTEKAR_CFG_PROFILE
+        self.cfg_profile = cfg_profile
+        self.model: Any = None  # MusicGen instance
+        
+    def setup_model(self):
+        """MusicGen modelini kurar"""
+        if not install_requirements():
+            return False
+        try:
+            # Suppress warnings during model loading
+            import warnings
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=UserWarning)
+                warnings.filterwarnings("ignore", message=".*xFormers.*")
+                warnings.filterwarnings("ignore", message=".*FFmpeg.*")
+                
+                registry = get_model_registry()
+                logger.info("Model yüklemesi başlıyor", model=self.requested_model)
+
+                # Show user-friendly message
+                if registry.is_loaded(self.requested_model):
+                    print(f"♻️  Reusing cached {self.requested_model} model")
+                else:
+                    print(f"🔄 Loading {self.requested_model} model (this may take a few minutes)...")
+
+                self.model = registry.get(self.requested_model)
+                self.model.set_generation_params(**{
+                    **dict(
+                        duration=180,
+                        temperature=1.0,
+                        top_k=250,
+                        top_p=0.0,
+                        cfg_coef=3.0,
+                        # Enable compression for better memory efficiency
                         use_sampling=True,
                         two_step_cfg=True
-                    )
+                    ),
+                    **get_cfg_profile(self.cfg_profile),
+                })
+                
+            logger.success("Model başarıyla yüklendi", model=self.requested_model)
+            print(f"✅ Model loaded successfully!")
+            return True
+        except Exception as e:
+            logger.exception("Model yüklenirken hata", error=str(e))
+            print(f"❌ Failed to load model: {str(e)}")
+            return False
+    
+    def _build_description(self, style: str, instrumental: bool) -> str:
+        """Build the MusicGen text prompt for *style*."""
+        # Enhanced vocal prompts for better vocal generation
+        if instrumental:
+            return f"{style}, instrumental, no vocals, beautiful Turkish melody"
+
+        # More specific vocal descriptions for better results
+        vocal_keywords = [
+            "WITH CLEAR FEMALE VOCALS",
+            "singing in Turkish",
+            "expressive voice",
+            "melodic vocals",
+            "beautiful voice"
+        ]
+
+        # Add vocal keywords if not already present
+        style_enhanced = style
+        if not any(keyword.lower() in style.lower() for keyword in ["vocal", "sing", "voice"]):
+            style_enhanced += f", {vocal_keywords[0]}, {vocal_keywords[1]}"
+
+        return f"{style_enhanced}, beautiful Turkish melody with emotional singing"
+
+    def _model_generation_params(self, duration: int, instrumental: bool) -> dict:
+        """Return MusicGen generation parameters tuned for the selected model."""
+        # Dynamic parameters optimized for the selected model
+        if not instrumental:
+            # Adjust parameters based on model size for optimal performance
+            if "large" in self.requested_model:
+                return dict(
+                    duration=duration,
+                    temperature=1.1,  # Higher creativity for large model
+                    top_k=300,  # More diverse sampling with large model
+                    top_p=0.95,  # Better nucleus sampling for vocals
+                    cfg_coef=5.0,  # Higher guidance for better prompt following
+                    use_sampling=True,
+                    two_step_cfg=True  # Better quality with large model
+                )
+            return dict(
+                duration=duration,
+                temperature=1.0,  # Standard creativity for smaller models
+                top_k=250,  # Balanced sampling
+                top_p=0.9,  # Good nucleus sampling
+                cfg_coef=4.0,  # Balanced guidance
+                use_sampling=True,
+                two_step_cfg=True
+            )
+
+        # Instrumental parameters adjusted for model size
+        if "large" in self.requested_model:
+            return dict(
+                duration=duration,
+                temperature=1.0,  # Balanced creativity for instrumental
+                top_k=300,
+                top_p=0.85,  # Good nucleus sampling for instrumental variety
+                cfg_coef=4.0,  # Optimized guidance for large model
+                use_sampling=True,
+                two_step_cfg=True
+            )
+        return dict(
+            duration=duration,
+            temperature=0.9,  # Slightly lower for smaller models
+            top_k=250,
+            top_p=0.8,  # Conservative sampling
+            cfg_coef=3.5,  # Lower guidance for efficiency
+            use_sampling=True,
+            two_step_cfg=True
+        )
+
+    def _generation_params(self, duration: int, instrumental: bool) -> dict:
+        """Model defaults with the CFG profile (see ``get_cfg_profile``) applied."""
+        params = self._model_generation_params(duration, instrumental)
+        params.update(get_cfg_profile(self.cfg_profile))
+        return params
+
+    def generate_song(self, lyrics, style="Turkish emotional pop ballad WITH FEMALE VOCALS, acoustic guitar, piano", duration=180, output_name=None, instrumental: bool = False, stream: bool = False, checkpoint: Optional[bool] = None, resume: bool = False, seed: Optional[int] = None, progress_callback=None, generation_overrides: Optional[dict] = None):
+        """Şarkı üretir
+
+        With *stream* enabled, the song is written segment by segment to the
+        output file so memory stays flat and the file is playable while it
+        grows; once complete it is loudness normalized like the regular
+        output.  *progress_callback* receives the playable length in seconds.  *checkpoint* saves every chunk to
+        ``{output_name}_partNN.wav`` for recovery.  *resume* continues an
+        interrupted long generation from those chunks; its recovery files
+        are removed once the song is written.  *generation_overrides* are
+        applied on top of the model's default parameters (see
+        ``plan_generation``).
+        """
+        if not self.model and not self.setup_model():
+            return None
+        
+        try:
+            from audiocraft.data.audio import audio_write
             
-            if duration > 30:
-                waveform = _safe_generate(self.model, description, duration, base_output=output_name or "musicgen_chunk")
-            else:
-                waveform = self.model.generate([description], progress=True)
+            description = self._build_description(style, instrumental)
             
+            logger.info("Şarkı üretimi başladı", instrumental=instrumental, duration=duration)
+            print(f"🎼 Şarkı üretiliyor...")
+            print(f"📝 Sözler: {len(lyrics)} karakter")
+            print(f"🎨 Stil: {description}")
+            print(f"🎤 Enstrümantal: {'Evet' if instrumental else 'Hayır'}")
+            print(f"⏱️  Süre: {duration} saniye")
+            print(f"🔧 Model: {self.requested_model}")
+            
+            # Model recommendations based on auto-selected model
+            if not instrumental and "small" in self.requested_model:
+                print("🎵 Using small model - optimized for your system resources")
+                print("💡 Tip: For better quality, consider upgrading RAM or using GPU acceleration")
+            elif not instrumental and "medium" in self.requested_model:
+                print("🎵 Using medium model - balanced quality and performance for your system")
+                print("💡 Good balance of quality and resource usage")
+            elif not instrumental and "large" in self.requested_model:
+                print("🎯 Using LARGE model - your system has excellent resources!")
+                print("🎤 Best vocal quality with optimal performance")
+            
+            params = self._generation_params(duration, instrumental)
+            params.update(generation_overrides or {})
+            self.model.set_generation_params(**params)
+            
+            chunk_prefix = output_name or "musicgen_chunk"
             if output_name is None:
                 output_name = f"bestekar_song_{hash(lyrics) % 10000}"
+            output_file = f"{output_name}.wav"
             
-            audio_write(
-                output_name, 
-                waveform[0].cpu(), 
-                self.model.sample_rate, 
-                strategy="loudness"
-            )
+            # Replayed chunks would overstate throughput, so only fresh runs are recorded
+            fresh_run = not (resume and GenerationCheckpoint.load(chunk_prefix) is not None)
+            generation_start = time.time()
+            if stream:
+                _stream_generate_to_wav(
+                    self.model, description, duration, output_file,
+                    base_output=chunk_prefix, checkpoint=checkpoint,
+                    resume=resume, seed=seed, params=params,
+                    progress_callback=progress_callback
+                )
+                _normalize_loudness_in_place(output_file)
+            else:
+                if duration > 30:
+                    waveform = _safe_generate(
+                        self.model, description, duration,
+                        base_output=chunk_prefix, checkpoint=checkpoint,
+                        resume=resume, seed=seed, params=params
+                    )
+                else:
+                    waveform = self.model.generate([description], progress=True)
+                
+                audio_write(
+                    output_name, 
+                    waveform[0].cpu(), 
+                    self.model.sample_rate, 
+                    strategy="loudness"
+                )
+            
+            # Record the CFG mode the model actually ran with, not the one requested
+            effective_params = getattr(self.model, "generation_params", None) or {}
+            if fresh_run and "two_step_cfg" in effective_params:
+                record_generation_throughput(
+                    self.requested_model, duration, time.time() - generation_start,
+                    bool(effective_params["two_step_cfg"])
+                )
+            
+            # Recovery files are only needed until the song is complete
+            keep_chunks = checkpoint if checkpoint is not None else _checkpoint_chunks_default()
+            if resume and not keep_chunks:
+                finished = GenerationCheckpoint.load(chunk_prefix)
+                if finished is not None:
+                    finished.discard()
             
-            output_file = f"{output_name}.wav"
             logger.success("Şarkı oluşturuldu", file=os.path.abspath(output_file))
             print(f"✅ Şarkı oluşturuldu: {output_file}")
             print(f"📁 Konum: {os.path.abspath(output_file)}")
@@ -1344,15 +2469,366 @@ class TurkishSongGenerator(BaseSongGenerator):
             logger.exception("Üretim sırasında hata", error=str(e))
             return None
 
+    def generate_batch(self, requests: List[dict], max_batch_size: Optional[int] = None) -> List[Optional[str]]:
+        """Generate several songs, batching compatible requests into one forward pass.
+
+        Each request is a dict with ``lyrics`` and ``style`` and optional
+        ``duration``, ``instrumental`` and ``output_name`` keys.  Requests that
+        share duration and generation parameters are rendered together with a
+        single ``model.generate`` call; every output is written to its own file.
+        Returns the output paths in request order (None for failed items).
+        """
+        if not requests:
+            return []
+        if not self.model and not self.setup_model():
+            return [None] * len(requests)
+
+        if max_batch_size is None:
+            try:
+                max_batch_size = int(os.getenv("BESTEKAR_MAX_BATCH_SIZE", "4"))
+            except ValueError:
+                max_batch_size = 4
+        max_batch_size = max(1, max_batch_size)
+
+        from audiocraft.data.audio import audio_write
+
+        # Group requests whose generation parameters are identical
+        groups: dict = {}
+        for idx, req in enumerate(requests):
+            duration = int(req.get("duration", 30))
+            instrumental = bool(req.get("instrumental", False))
+            params = self._generation_params(duration, instrumental)
+            key = tuple(sorted(params.items()))
+            groups.setdefault(key, []).append(idx)
+
+        outputs: List[Optional[str]] = [None] * len(requests)
+        for key, indices in groups.items():
+            params = dict(key)
+            duration = params["duration"]
+            for start in range(0, len(indices), max_batch_size):
+                batch = indices[start:start + max_batch_size]
+                descriptions = [
+                    self._build_description(
+                        requests[i].get("style", "Turkish emotional pop ballad"),
+                        bool(requests[i].get("instrumental", False)),
+                    )
+                    for i in batch
+                ]
+                output_names = [
+                    requests[i].get("output_name") or f"bestekar_song_{hash(requests[i].get('lyrics', '')) % 10000}_{i}"
+                    for i in batch
+                ]
+
+                logger.info("Batch generation started", size=len(batch), duration=duration)
+                print(f"🎼 Batch üretimi: {len(batch)} şarkı, {duration} saniye")
+                try:
+                    self.model.set_generation_params(**params)
+                    if duration > 30:
+                        waveform = _safe_generate(
+                            self.model, descriptions, duration, base_output=output_names, params=params
+                        )
+                    else:
+                        waveform = self.model.generate(descriptions, progress=True)
+                except Exception as e:
+                    logger.exception("Batch generation failed", error=str(e))
+                    continue
+
+                for row, i in enumerate(batch):
+                    try:
+                        audio_write(
+                            output_names[row],
+                            waveform[row].cpu(),
+                            self.model.sample_rate,
+                            strategy="loudness"
+                        )
+                        outputs[i] = f"{output_names[row]}.wav"
+                        logger.success("Şarkı oluşturuldu", file=os.path.abspath(outputs[i]))
+                    except Exception as e:
+                        logger.exception("Failed to write batch output", error=str(e))
+
+        return outputs
+
 # ---------------- Utility ----------------
 
+def _checkpoint_chunks_default() -> bool:
+    """Return True if chunk checkpoints are enabled via BESTEKAR_CHECKPOINT_CHUNKS."""
+    return os.getenv("BESTEKAR_CHECKPOINT_CHUNKS", "0") in {"1", "true", "True"}
+
+class GenerationCheckpoint:
+    """Chunk checkpoints plus a JSON manifest for resuming long generations.
+
+    Every finished segment is written as raw float audio to
+    ``{prefix}_partNN.wav`` (one file per batch item) and recorded in
+    ``{base_output}_manifest.json`` together with the prompt, generation
+    parameters and seed.  A crashed job can then reload the saved segments
+    and continue from the last overlap window instead of starting over.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        base_outputs: List[str],
+        descriptions: List[str],
+        duration: int,
+        overlap: int,
+        seed: int,
+        params: Optional[dict] = None,
+    ):
+        self.base_outputs = list(base_outputs)
+        self.descriptions = list(descriptions)
+        self.duration = int(duration)
+        self.overlap = int(overlap)
+        self.seed = int(seed)
+        self.params = dict(params or {})
+        self.segments: List[dict] = []
+        self.total_generated = 0
+
+    @staticmethod
+    def manifest_path(base_output: str) -> str:
+        return f"{base_output}_manifest.json"
+
+    @property
+    def path(self) -> str:
+        return self.manifest_path(self.base_outputs[0])
+
+    def _state(self) -> dict:
+        return {
+            "version": self.VERSION,
+            "base_outputs": self.base_outputs,
+            "descriptions": self.descriptions,
+            "duration": self.duration,
+            "overlap": self.overlap,
+            "seed": self.seed,
+            "params": self.params,
+            "segments": self.segments,
+            "total_generated": self.total_generated,
+            "updated": datetime.now().isoformat(),
+        }
+
+    def _write_manifest(self) -> None:
+        import json
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)  # atomic: never leave a torn manifest
+
+    @classmethod
+    def load(cls, base_output: str) -> Optional["GenerationCheckpoint"]:
+        """Load the manifest for *base_output*, or None if absent or unreadable."""
+        import json
+
+        path = cls.manifest_path(base_output)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != cls.VERSION:
+                return None
+            ckpt = cls(
+                state["base_outputs"], state["descriptions"], state["duration"],
+                state["overlap"], state["seed"], state.get("params"),
+            )
+            ckpt.segments = state.get("segments", [])
+            ckpt.total_generated = int(state.get("total_generated", 0))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable generation manifest {path}: {e}")
+            return None
+
+        # Only trust segments whose files all still exist
+        valid = []
+        for segment in ckpt.segments:
+            if not all(os.path.isfile(p) for p in segment["files"]):
+                break
+            valid.append(segment)
+        if len(valid) != len(ckpt.segments):
+            ckpt.segments = valid
+            ckpt.total_generated = valid[-1]["total_generated"] if valid else 0
+        return ckpt
+
+    def matches(self, descriptions: List[str], duration: int, overlap: int, params: Optional[dict] = None) -> bool:
+        """Return True if this manifest was written for the same request."""
+        return (
+            self.descriptions == list(descriptions)
+            and self.duration == int(duration)
+            and self.overlap == int(overlap)
+            and (params is None or self.params == dict(params))
+        )
+
+    def record(self, segment, total_generated: int, sample_rate: int) -> None:
+        """Persist a finished *segment* and update the manifest."""
+        import numpy as np
+        import soundfile as sf
+
+        index = len(self.segments) + 1
+        files = []
+        audio = segment.detach().cpu().numpy()
+        for row, prefix in enumerate(self.base_outputs):
+            chunk_path = f"{prefix}_part{index:02d}.wav"
+            Path(chunk_path).parent.mkdir(parents=True, exist_ok=True)
+            sf.write(chunk_path, np.ascontiguousarray(audio[row].T), sample_rate, subtype="FLOAT")
+            files.append(chunk_path)
+            logger.success("Chunk saved", file=os.path.abspath(chunk_path))
+
+        self.segments.append({"index": index, "files": files, "total_generated": int(total_generated)})
+        self.total_generated = int(total_generated)
+        self._write_manifest()
+
+    def load_segments(self, device=None) -> list:
+        """Return the saved segments as ``(batch, channels, samples)`` tensors."""
+        import numpy as np
+        import soundfile as sf
+        import torch
+
+        loaded = []
+        for segment in self.segments:
+            rows = []
+            for chunk_path in segment["files"]:
+                data, _ = sf.read(chunk_path, dtype="float32", always_2d=True)
+                rows.append(np.ascontiguousarray(data.T))
+            tensor = torch.from_numpy(np.stack(rows))
+            loaded.append(tensor.to(device) if device is not None else tensor)
+        return loaded
+
+    def discard(self) -> None:
+        """Remove the manifest and every saved chunk."""
+        for segment in self.segments:
+            for chunk_path in segment["files"]:
+                try:
+                    os.remove(chunk_path)
+                except OSError:
+                    pass
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def _open_checkpoint(
+    descriptions: List[str],
+    duration: int,
+    base_outputs: List[str],
+    overlap: int,
+    *,
+    resume: bool,
+    seed: Optional[int],
+    params: Optional[dict],
+) -> GenerationCheckpoint:
+    """Return a matching manifest to resume from, or start a fresh one."""
+    if resume:
+        existing = GenerationCheckpoint.load(base_outputs[0])
+        if existing is not None and existing.matches(descriptions, duration, overlap, params):
+            if existing.segments:
+                logger.info(
+                    "Resuming generation from checkpoint",
+                    manifest=existing.path,
+                    generated=existing.total_generated,
+                )
+            return existing
+        if existing is not None:
+            logger.warning("Checkpoint manifest does not match request, starting over", manifest=existing.path)
+            existing.discard()
+
+    if seed is None:
+        import random
+
+        seed = random.randint(0, 2**31 - 1)
+    return GenerationCheckpoint(base_outputs, descriptions, duration, overlap, seed, params)
+
+def _stream_generate(
+    model,
+    description: Union[str, List[str]],
+    duration: int,
+    *,
+    overlap: int = 5,
+    segment_max: int = 30,
+    checkpoint: Optional[GenerationCheckpoint] = None,
+    params: Optional[dict] = None,
+):
+    """Yield newly generated audio as each 30-second segment finishes.
+
+    Every yielded tensor has shape ``(batch, channels, samples)`` and holds
+    only audio that will not be replaced later, so consumers can append it
+    directly to a buffer or file.  The last *overlap* seconds of each
+    segment are held back because the next continuation regenerates them;
+    only that small window is kept in memory between segments.
+
+    With a *checkpoint*, each segment is saved as it completes and any
+    segments already recorded in it are replayed instead of regenerated.
+
+    *params* are the generation parameters to use for every segment.
+    ``set_generation_params`` resets anything not passed to it, so they are
+    re-applied with each segment's duration instead of setting it alone.
+    """
+
+    import torch
+
+    # Guard: negative or zero durations would hang MusicGen internals.
+    if duration <= 0:
+        raise ValueError("Duration must be > 0 seconds")
+
+    descriptions = [description] if isinstance(description, str) else list(description)
+    overlap_samples = overlap * model.sample_rate
+    params = {key: value for key, value in (params or {}).items() if key != "duration"}
+
+    def _seed_segment(index: int) -> None:
+        # Per-segment seeds keep a resumed run on the same random stream
+        if checkpoint is not None:
+            torch.manual_seed(checkpoint.seed + index)
+
+    segment = None
+    total_generated = 0
+    saved = checkpoint.load_segments(getattr(model, "device", None)) if checkpoint is not None else []
+    for saved_segment in saved:
+        if segment is not None and segment.shape[-1] > overlap_samples:
+            yield segment[:, :, :-overlap_samples]
+        segment = saved_segment
+    if saved:
+        total_generated = checkpoint.total_generated
+
+    if segment is None:
+        model.set_generation_params(**params, duration=min(duration, segment_max))
+
+        # Generate first segment
+        _seed_segment(1)
+        segment = model.generate(descriptions, progress=True)
+        total_generated = min(duration, segment_max)
+        if checkpoint is not None:
+            checkpoint.record(segment, total_generated, model.sample_rate)
+
+    # Continue until requested length reached
+    while total_generated < duration:
+        # Everything before the overlap window is final
+        if segment.shape[-1] > overlap_samples:
+            yield segment[:, :, :-overlap_samples]
+        held = segment[:, :, -overlap_samples:]
+
+        logger.debug("Continuing generation", generated=total_generated)
+        next_len = min(duration - total_generated, segment_max)
+
+        # Continue from the last *overlap* seconds to maintain coherence
+        model.set_generation_params(**params, duration=next_len)
+        _seed_segment(len(checkpoint.segments) + 1 if checkpoint is not None else 0)
+        segment = model.generate_continuation(held, model.sample_rate, descriptions, progress=True)
+        total_generated += next_len
+        if checkpoint is not None:
+            checkpoint.record(segment, total_generated, model.sample_rate)
+
+    yield segment
+
 def _safe_generate(
     model,
-    description: str,
+    description: Union[str, List[str]],
     duration: int,
     *,
-    base_output: str = "musicgen_chunk",
+    base_output: Union[str, List[str]] = "musicgen_chunk",
     overlap: int = 5,
+    checkpoint: Optional[bool] = None,
+    resume: bool = False,
+    seed: Optional[int] = None,
+    params: Optional[dict] = None,
 ):
     """Generate audio safely by chunking into 30-second parts.
 
@@ -1361,52 +2837,186 @@ def _safe_generate(
     Windows).  This utility slices the request into max-30 s chunks and
     stitches them together with ``generate_continuation`` using *overlap*
     seconds of cross-fade to keep continuity.
+
+    Chunks are copied once into a preallocated buffer instead of being
+    re-concatenated on every step.  With *checkpoint* enabled each chunk is
+    also written to ``{base_output}_partNN.wav`` with a resume manifest;
+    *resume* (which implies *checkpoint*) continues from such a manifest
+    when it matches the request.
+
+    *description* may be a list to render a batch in one pass; *base_output*
+    then holds one chunk prefix per batch item.
     """
+    import torch
 
-    # Guard: negative or zero durations would hang MusicGen internals.
-    if duration <= 0:
-        raise ValueError("Duration must be > 0 seconds")
+    descriptions = [description] if isinstance(description, str) else list(description)
+    base_outputs = [base_output] if isinstance(base_output, str) else list(base_output)
+    if len(base_outputs) != len(descriptions):
+        raise ValueError("base_output must provide one prefix per description")
+    if checkpoint is None:
+        checkpoint = _checkpoint_chunks_default()
 
-    segment_max = 30  # hard limit for a single forward-pass
+    ckpt = None
+    if checkpoint or resume:
+        ckpt = _open_checkpoint(
+            descriptions, duration, base_outputs, overlap, resume=resume, seed=seed, params=params
+        )
 
-    model.set_generation_params(duration=min(duration, segment_max))
+    buffer = None
+    filled = 0
+    for chunk in _stream_generate(model, descriptions, duration, overlap=overlap, checkpoint=ckpt, params=params):
+        if buffer is None:
+            # Output never exceeds the requested duration; keep one second of slack
+            capacity = (duration + 1) * model.sample_rate
+            buffer = torch.empty(
+                (chunk.shape[0], chunk.shape[1], capacity), dtype=chunk.dtype, device=chunk.device
+            )
+        length = chunk.shape[-1]
+        if filled + length > buffer.shape[-1]:
+            grown = torch.empty(
+                (buffer.shape[0], buffer.shape[1], filled + length), dtype=buffer.dtype, device=buffer.device
+            )
+            grown[:, :, :filled] = buffer[:, :, :filled]
+            buffer = grown
+        buffer[:, :, filled:filled + length] = chunk
+        filled += length
 
-    # Generate first segment
-    waveform = model.generate([description], progress=True)
+    return buffer[:, :, :filled]
 
-    # Immediately persist first chunk to disk
-    from audiocraft.data.audio import audio_write  # late import
+class IncrementalWavWriter:
+    """Append float audio chunks to a WAV file as they are produced.
 
-    chunk_idx = 1
-    chunk_path = f"{base_output}_part{chunk_idx:02d}.wav"
-    audio_write(chunk_path, waveform[0].cpu(), model.sample_rate, strategy="loudness")
-    logger.success("Chunk saved", file=os.path.abspath(chunk_path))
+    Memory use is bounded by the chunk size, so long songs can be written
+    without holding the full waveform.  The RIFF header is rewritten after
+    every chunk, so the file is playable while generation is still running.
+    Samples are clipped to [-1, 1] and stored as 16-bit PCM.
+    """
 
-    total_generated = min(duration, segment_max)
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        import wave
 
-    # Continue until requested length reached
-    while total_generated < duration:
-        logger.debug("Continuing generation", generated=total_generated)
-        remaining = duration - total_generated
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_written = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "wb")
+        self._wav = wave.open(self._file, "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+        self._closed = False
 
-        next_len = min(remaining, segment_max)
+    def write(self, audio) -> None:
+        """Append a ``(channels, samples)`` tensor or array."""
+        import numpy as np
 
-        # Pick last *overlap* seconds from current audio to maintain coherence
-        last_audio = waveform[:, :, -overlap * model.sample_rate :]
-        model.set_generation_params(duration=next_len)
-        cont = model.generate_continuation(last_audio, model.sample_rate, [description], progress=True)
+        if hasattr(audio, "detach"):
+            audio = audio.detach().cpu().numpy()
+        frames = np.clip(np.asarray(audio, dtype=np.float32).T, -1.0, 1.0)
+        pcm = (frames * 32767.0).astype("<i2")
+        # wave patches the header sizes whenever the data length changes
+        self._wav.writeframes(pcm.tobytes())
+        self._file.flush()
+        self.frames_written += pcm.shape[0]
 
-        # Immediately persist continuation chunk before stitching (for recovery)
-        chunk_idx += 1
-        chunk_path = f"{base_output}_part{chunk_idx:02d}.wav"
-        audio_write(chunk_path, cont[0].cpu(), model.sample_rate, strategy="loudness")
-        logger.success("Chunk saved", file=os.path.abspath(chunk_path))
+    @property
+    def seconds_written(self) -> float:
+        return self.frames_written / float(self.sample_rate)
 
-        # Stitch – drop the overlapped head from continuation to avoid duplicate
-        waveform = torch.cat([waveform[:, :, : -overlap * model.sample_rate], cont], dim=2)
-        total_generated += next_len
+    def close(self) -> None:
+        if not self._closed:
+            self._wav.close()
+            self._file.close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
 
-    return waveform
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _normalize_loudness_in_place(path: str, target_lufs: float = -14.0, block_size: int = 65536) -> str:
+    """Apply ``audio_write``'s loudness strategy to a finished streamed WAV.
+
+    The file is measured with :class:`LoudnessMeter` and then rescaled block
+    by block, so memory use is independent of the song's length.  As with
+    ``audio_write``, silence is left as is and the result is clipped to
+    [-1, 1].  The normalized copy is written next to *path* and swapped in,
+    so the preview stays playable until the final file replaces it.
+    """
+    import numpy as np
+    import soundfile as sf
+
+    with sf.SoundFile(path) as source:
+        meter = LoudnessMeter(source.samplerate, source.channels)
+        for block in source.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+            meter.update(block)
+    lufs = meter.integrated_lufs()
+    if not np.isfinite(lufs):
+        return path
+    gain = 10 ** ((target_lufs - lufs) / 20.0)
+
+    normalized = f"{os.path.splitext(path)[0]}.normalized.wav"
+    try:
+        with sf.SoundFile(path) as source, sf.SoundFile(
+            normalized, "w", samplerate=source.samplerate, channels=source.channels,
+            format="WAV", subtype="PCM_16"
+        ) as out:
+            for block in source.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+                out.write(np.clip(block * gain, -1.0, 1.0))
+        os.replace(normalized, path)
+    except Exception:
+        Path(normalized).unlink(missing_ok=True)
+        raise
+    return path
+
+def _stream_generate_to_wav(
+    model,
+    description: str,
+    duration: int,
+    output_path: str,
+    *,
+    base_output: str = "musicgen_chunk",
+    overlap: int = 5,
+    checkpoint: Optional[bool] = None,
+    resume: bool = False,
+    seed: Optional[int] = None,
+    params: Optional[dict] = None,
+    progress_callback=None,
+) -> str:
+    """Stream a generation straight into *output_path* with flat memory use.
+
+    The file is playable after every segment; *progress_callback* receives
+    the playable length in seconds each time it grows.
+    """
+    if checkpoint is None:
+        checkpoint = _checkpoint_chunks_default()
+
+    ckpt = None
+    if checkpoint or resume:
+        ckpt = _open_checkpoint(
+            [description], duration, [base_output], overlap, resume=resume, seed=seed, params=params
+        )
+
+    writer = None
+    try:
+        for chunk in _stream_generate(
+            model, description, duration, overlap=overlap, checkpoint=ckpt, params=params
+        ):
+            if writer is None:
+                writer = IncrementalWavWriter(output_path, model.sample_rate, chunk.shape[1])
+            writer.write(chunk[0])
+            logger.debug("Streamed chunk", file=output_path, seconds=f"{writer.seconds_written:.1f}")
+            if progress_callback is not None:
+                try:
+                    progress_callback(writer.seconds_written)
+                except Exception as e:
+                    logger.debug(f"Progress callback failed: {e}")
+    finally:
+        if writer is not None:
+            writer.close()
+    return output_path
 
 # ------------------------------------------------------------------
 # RVC Setup Functions
@@ -1414,14 +3024,14 @@ def _safe_generate(
 
 def download_default_rvc_model():
     """Download a real Turkish RVC model if not exists."""
-    try:
-        import requests
-    except ImportError:
+    import importlib.util
+    # Downloads go through bestedl, shared with besteml
+    from bestedl import download_files
+
+    if importlib.util.find_spec("requests") is None:
         logger.warning("requests library not available, creating placeholder files")
         return _create_placeholder_rvc_model()
     
-    from datetime import datetime
-    
     models_dir = Path("rvc/models")
     indices_dir = Path("rvc/indices")
     models_dir.mkdir(parents=True, exist_ok=True)
@@ -1457,30 +3067,18 @@ def download_default_rvc_model():
             try:
                 logger.info(f"Trying to download {source['name']}...")
                 
-                # Download model file
-                logger.info("Downloading model file...")
-                response = requests.get(source["model_url"], stream=True, timeout=60)
-                response.raise_for_status()
-                
-                with open(model_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                # Download index file
-                logger.info("Downloading index file...")
-                response = requests.get(source["index_url"], stream=True, timeout=60)
-                response.raise_for_status()
-                
-                with open(index_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                # Model and index download concurrently; each lands atomically
+                download_files([
+                    {"urls": source["model_url"], "dest": model_file},
+                    {"urls": source["index_url"], "dest": index_file},
+                ])
                 
                 logger.success(f"RVC model downloaded successfully from {source['name']}")
                 return str(model_file), str(index_file)
                 
             except Exception as e:
                 logger.warning(f"Failed to download from {source['name']}: {e}")
-                # Clean up partial files
+                # Drop a half-finished pair so sources are never mixed; .part files stay for resume
                 if model_file.exists():
                     model_file.unlink()
                 if index_file.exists():
@@ -1612,28 +3210,114 @@ For best results with Turkish songs, consider using models trained specifically
     logger.success("RVC integration setup complete")
 
 # RVC Integration for Local AI Singing
-try:
-    import edge_tts
-    import asyncio
-    import tempfile
-    import subprocess
-    from pathlib import Path
-    import soundfile as sf
-    import librosa
-    RVC_AVAILABLE = True
-except ImportError:
-    RVC_AVAILABLE = False
+_rvc_available: Optional[bool] = None
+
+def rvc_available() -> bool:
+    """Whether the TTS/audio stack for RVC singing is importable (checked once)."""
+    global _rvc_available
+    if _rvc_available is None:
+        import importlib.util
+
+        _rvc_available = all(
+            importlib.util.find_spec(name) is not None for name in ("edge_tts", "soundfile", "librosa")
+        )
+    return _rvc_available
+
+def _file_mtime(path: Optional[str]) -> Optional[float]:
+    """Return the modification time of *path*, or None if it is missing."""
+    if not path:
+        return None
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+class RVCConverterCache:
+    """Process-wide cache of loaded ``rvc_python.RVC`` converters.
+
+    Converters are keyed by ``(model_path, index_path, device)``.  An entry is
+    reloaded when the checkpoint or index file changes on disk, so retrained
+    voices are picked up without restarting the worker.
+    """
+
+    def __init__(self):
+        import threading
+
+        self._converters: dict = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(model_path: str, index_path: Optional[str], device: str) -> tuple:
+        return (
+            os.path.abspath(model_path),
+            os.path.abspath(index_path) if index_path else None,
+            device,
+        )
+
+    def get(self, model_path: str, index_path: Optional[str] = None, device: str = "cpu"):
+        """Return a loaded converter, (re)loading it if missing or stale."""
+        key = self._key(model_path, index_path, device)
+        mtimes = (_file_mtime(model_path), _file_mtime(index_path))
+
+        with self._lock:
+            entry = self._converters.get(key)
+            if entry is not None and entry["mtimes"] == mtimes:
+                logger.debug("RVC converter served from cache", model=model_path)
+                return entry["rvc"]
+            if entry is not None:
+                logger.info("RVC model changed on disk, reloading", model=model_path)
+
+            import rvc_python
+
+            rvc = rvc_python.RVC(
+                model_path=model_path,
+                index_path=index_path,
+                device=device
+            )
+            self._converters[key] = {"rvc": rvc, "mtimes": mtimes}
+            logger.info("RVC converter loaded", model=model_path, device=device)
+            return rvc
+
+    def release(self, model_path: Optional[str] = None, index_path: Optional[str] = None, device: Optional[str] = None) -> int:
+        """Drop matching converters (all of them if no filter is given).
+
+        Returns the number of released entries.
+        """
+        with self._lock:
+            to_drop = [
+                key for key in self._converters
+                if (model_path is None or key[0] == os.path.abspath(model_path))
+                and (index_path is None or key[1] == os.path.abspath(index_path))
+                and (device is None or key[2] == device)
+            ]
+            for key in to_drop:
+                del self._converters[key]
+        if to_drop:
+            _free_torch_memory()
+            logger.info(f"Released {len(to_drop)} RVC converter(s)")
+        return len(to_drop)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._converters)
+
+_rvc_converter_cache = RVCConverterCache()
+
+def get_rvc_converter_cache() -> RVCConverterCache:
+    """Return the process-wide RVC converter cache."""
+    return _rvc_converter_cache
 
 class RVCSinger:
     """Turkish RVC Singer for converting TTS to singing voice."""
 
-    def __init__(self, rvc_model_path: Optional[str] = None, index_path: Optional[str] = None):
+    def __init__(self, rvc_model_path: Optional[str] = None, index_path: Optional[str] = None, device: str = "cpu"):
         # If no model specified, try to use default model
         if rvc_model_path is None:
             rvc_model_path, index_path = get_default_rvc_model()
-        
+
         self.rvc_model_path = rvc_model_path
         self.index_path = index_path
+        self.device = device  # CPU by default for compatibility
         self.rvc_loaded = False
         
         # Ensure RVC directory structure exists
@@ -1657,9 +3341,12 @@ class RVCSinger:
             logger.info("Dependencies are managed in pyproject.toml")
             return False
     
-    async def text_to_speech(self, text: str, voice: str = "tr-TR-EmelNeural", output_path: str = "temp_tts.wav") -> str:
+    @staticmethod
+    async def text_to_speech(text: str, voice: str = "tr-TR-EmelNeural", output_path: str = "temp_tts.wav") -> str:
         """Convert text to speech using Edge TTS."""
         try:
+            import edge_tts
+
             communicate = edge_tts.Communicate(text, voice)
             await communicate.save(output_path)
             return output_path
@@ -1674,15 +3361,9 @@ class RVCSinger:
             return False
             
         try:
-            import rvc_python
-            
-            # Load RVC model
-            rvc = rvc_python.RVC(
-                model_path=self.rvc_model_path,
-                index_path=self.index_path,
-                device="cpu"  # Use CPU for compatibility
-            )
-            
+            # Reuse the loaded converter for this voice when possible
+            rvc = get_rvc_converter_cache().get(self.rvc_model_path, self.index_path, self.device)
+
             # Convert voice
             rvc.convert(
                 input_path=input_audio,
@@ -1700,7 +3381,25 @@ class RVCSinger:
         except Exception as e:
             logger.exception("RVC conversion failed", error=str(e))
             return False
-    
+
+    def warmup(self) -> bool:
+        """Load the RVC converter ahead of time so the first conversion is fast."""
+        if not self.rvc_model_path or not Path(self.rvc_model_path).exists():
+            logger.warning("Cannot warm up RVC, model not found", path=self.rvc_model_path)
+            return False
+        try:
+            get_rvc_converter_cache().get(self.rvc_model_path, self.index_path, self.device)
+            return True
+        except Exception as e:
+            logger.warning(f"RVC warmup failed: {e}")
+            return False
+
+    def release(self) -> bool:
+        """Drop this singer's cached converter. Return True if one was loaded."""
+        if not self.rvc_model_path:
+            return False
+        return get_rvc_converter_cache().release(self.rvc_model_path, self.index_path, self.device) > 0
+
     async def generate_singing_voice(self, lyrics: str, output_path: str, voice: str = "tr-TR-EmelNeural") -> Optional[str]:
         """Generate singing voice from lyrics using TTS + RVC pipeline."""
         if not self.setup_rvc_environment():
@@ -1708,6 +3407,7 @@ class RVCSinger:
             
         try:
             # Step 1: Generate TTS
+            import tempfile
             temp_tts = tempfile.mktemp(suffix=".wav")
             tts_result = await self.text_to_speech(lyrics, voice, temp_tts)
             
@@ -1738,12 +3438,17 @@ class RVCSinger:
 class TurkishSongGeneratorWithRVC(TurkishSongGenerator):
     """Turkish song generator with integrated RVC singing."""
     
-    def __init__(self, model_name: Optional[str] = None, rvc_model_path: Optional[str] = None, rvc_index_path: Optional[str] = None):
-        super().__init__(model_name)
+    def __init__(self, model_name: Optional[str] = None, rvc_model_path: Optional[str] = None, rvc_index_path: Optional[str] = None, cfg_profile: Optional[str] = None):
+        super().__init__(model_name, cfg_profile)
         self.rvc_singer = RVCSinger(rvc_model_path, rvc_index_path)
         
-    async def generate_complete_song(self, lyrics: str, style: str = "Turkish emotional pop ballad", duration: int = 180, output_name: str = None, add_vocals: bool = True) -> Optional[str]:
-        """Generate complete song with backing track and vocals."""
+    async def generate_complete_song(self, lyrics: str, style: str = "Turkish emotional pop ballad", duration: int = 180, output_name: str = None, add_vocals: bool = True, resume: bool = False, seed: Optional[int] = None, stream: bool = False, progress_callback=None, generation_overrides: Optional[dict] = None) -> Optional[str]:
+        """Generate complete song with backing track and vocals.
+
+        *resume*, *seed*, *stream*, *progress_callback* and
+        *generation_overrides* are passed to the instrumental generation
+        (see ``generate_song``).
+        """
         
         try:
             print("🎵 Starting complete song generation pipeline...")
@@ -1757,7 +3462,12 @@ class TurkishSongGeneratorWithRVC(TurkishSongGenerator):
                 style=style,
                 duration=duration,
                 output_name=f"{output_name}_instrumental" if output_name else None,
-                instrumental=True
+                instrumental=True,
+                resume=resume,
+                seed=seed,
+                stream=stream,
+                progress_callback=progress_callback,
+                generation_overrides=generation_overrides
             )
             
             if not instrumental_file:
@@ -1798,44 +3508,328 @@ class TurkishSongGeneratorWithRVC(TurkishSongGenerator):
     
     async def mix_audio_tracks(self, instrumental_path: str, vocal_path: str, output_name: str = None) -> Optional[str]:
         """Mix instrumental and vocal tracks."""
-        try:
-            import librosa
-            import soundfile as sf
-            import numpy as np
-            
-            # Load audio files
-            instrumental, sr1 = librosa.load(instrumental_path, sr=None)
-            vocals, sr2 = librosa.load(vocal_path, sr=None)
-            
-            # Ensure same sample rate
-            if sr1 != sr2:
-                vocals = librosa.resample(vocals, orig_sr=sr2, target_sr=sr1)
-                sr2 = sr1
-            
-            # Ensure same length (pad shorter one or trim longer one)
-            min_length = min(len(instrumental), len(vocals))
-            instrumental = instrumental[:min_length]
-            vocals = vocals[:min_length]
-            
-            # Mix with appropriate levels
-            # Reduce instrumental volume slightly to make room for vocals
-            mixed = (instrumental * 0.7) + (vocals * 0.8)
-            
-            # Normalize to prevent clipping
-            mixed = mixed / np.max(np.abs(mixed)) * 0.95
-            
-            # Save mixed audio
-            output_file = f"{output_name}_complete.wav" if output_name else "bestekar_complete_song.wav"
-            sf.write(output_file, mixed, sr1)
-            
-            return output_file
-            
-        except Exception as e:
-            logger.exception("Audio mixing failed", error=str(e))
-            return None
+        return mix_audio_tracks(instrumental_path, vocal_path, output_name)
+
+class StreamingResampler:
+    """Block-wise polyphase resampler with the same filter as ``resample_poly``.
+
+    Input can be fed in arbitrary blocks; only the filter history is kept
+    between calls, so memory does not depend on the signal length.  Output
+    is delay-compensated and, after ``flush()``, has
+    ``ceil(n_in * target_sr / orig_sr)`` frames.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int, channels: int, max_outputs_per_step: int = 16384):
+        import numpy as np
+        from math import gcd
+
+        g = gcd(int(orig_sr), int(target_sr))
+        self.up = int(target_sr) // g
+        self.down = int(orig_sr) // g
+        self.channels = channels
+        self.max_outputs_per_step = max_outputs_per_step
+        self.passthrough = self.up == self.down
+        self._buffer = np.zeros((0, channels), dtype=np.float32)
+        self._buffer_start = 0  # global input index of _buffer[0]
+        self._inputs_seen = 0
+        self._next_out = 0
+
+        if not self.passthrough:
+            from scipy.signal import firwin
+
+            max_rate = max(self.up, self.down)
+            half_len = 10 * max_rate
+            h = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * self.up
+            self.delay = half_len  # group delay in upsampled samples
+            self.taps = -(-len(h) // self.up)
+            padded = np.zeros(self.taps * self.up)
+            padded[:len(h)] = h
+            # table[phase, j] = h[phase + j * up]
+            self.table = padded.reshape(self.taps, self.up).T.astype(np.float32)
+
+    def process(self, block):
+        """Feed a ``(frames, channels)`` block and return the ready output."""
+        import numpy as np
+
+        block = np.asarray(block, dtype=np.float32)
+        if self.passthrough:
+            return block
+        self._buffer = np.concatenate([self._buffer, block])
+        self._inputs_seen += len(block)
+        limit = (self._inputs_seen * self.up - 1 - self.delay) // self.down + 1
+        return self._emit(max(limit, self._next_out))
+
+    def flush(self):
+        """Return the remaining output once the input is exhausted."""
+        import numpy as np
+
+        if self.passthrough:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        total = -(-self._inputs_seen * self.up // self.down)
+        return self._emit(total)
+
+    def _emit(self, n_end: int):
+        import numpy as np
+
+        pieces = []
+        j = np.arange(self.taps)
+        while self._next_out < n_end:
+            n = np.arange(self._next_out, min(n_end, self._next_out + self.max_outputs_per_step))
+            t = n * self.down + self.delay
+            i_max = t // self.up
+            phase = t - i_max * self.up
+
+            idx = i_max[:, None] - j[None, :]
+            valid = (idx >= 0) & (idx < self._inputs_seen)
+            local = np.clip(idx - self._buffer_start, 0, max(len(self._buffer) - 1, 0))
+            if len(self._buffer):
+                gathered = self._buffer[local] * valid[:, :, None]
+            else:
+                gathered = np.zeros(idx.shape + (self.channels,), dtype=np.float32)
+            pieces.append(np.einsum("nt,ntc->nc", self.table[phase], gathered).astype(np.float32))
+            self._next_out = int(n[-1]) + 1
+
+        # Drop input that no future output can reach
+        keep_from = max(0, (self._next_out * self.down + self.delay) // self.up - self.taps + 1)
+        if keep_from > self._buffer_start:
+            self._buffer = self._buffer[keep_from - self._buffer_start:]
+            self._buffer_start = keep_from
+
+        if not pieces:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        return np.concatenate(pieces)
+
+class LoudnessMeter:
+    """Single-pass integrated loudness (ITU-R BS.1770, gated) and peak meter.
+
+    Only one mean-square value per 100 ms is kept, so long files can be
+    measured block by block.
+    """
+
+    def __init__(self, sample_rate: int, channels: int):
+        import numpy as np
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.peak = 0.0
+        self._hop = max(1, int(round(0.1 * sample_rate)))
+        self._pending = np.zeros((0, channels))
+        self._subblocks: List[float] = []
+        self._sos = self._k_weighting(sample_rate)
+        self._zi = np.zeros((self._sos.shape[0], 2, channels))
+
+    @staticmethod
+    def _k_weighting(fs: int):
+        """K-weighting (high shelf + high pass) as second-order sections."""
+        import numpy as np
+
+        # High shelf
+        G, Q, fc = 3.999843853973347, 0.7071752369554196, 1681.974450955533
+        A = 10 ** (G / 40.0)
+        w0 = 2.0 * np.pi * fc / fs
+        alpha = np.sin(w0) / (2.0 * Q)
+        cos_w0 = np.cos(w0)
+        shelf = [
+            A * ((A + 1) + (A - 1) * cos_w0 + 2 * np.sqrt(A) * alpha),
+            -2 * A * ((A - 1) + (A + 1) * cos_w0),
+            A * ((A + 1) + (A - 1) * cos_w0 - 2 * np.sqrt(A) * alpha),
+            (A + 1) - (A - 1) * cos_w0 + 2 * np.sqrt(A) * alpha,
+            2 * ((A - 1) - (A + 1) * cos_w0),
+            (A + 1) - (A - 1) * cos_w0 - 2 * np.sqrt(A) * alpha,
+        ]
+
+        # High pass
+        Q, fc = 0.5003270373238773, 38.13547087602444
+        w0 = 2.0 * np.pi * fc / fs
+        alpha = np.sin(w0) / (2.0 * Q)
+        cos_w0 = np.cos(w0)
+        high_pass = [
+            (1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2,
+            1 + alpha, -2 * cos_w0, 1 - alpha,
+        ]
+
+        sos = np.array([shelf, high_pass], dtype=np.float64)
+        sos[:, :3] /= sos[:, 3:4]
+        sos[:, 3:] /= sos[:, 3:4]
+        return sos
+
+    def update(self, block) -> None:
+        """Measure a ``(frames, channels)`` block."""
+        import numpy as np
+        from scipy.signal import sosfilt
+
+        if not len(block):
+            return
+        self.peak = max(self.peak, float(np.max(np.abs(block))))
+        weighted, self._zi = sosfilt(self._sos, block, axis=0, zi=self._zi)
+        data = np.concatenate([self._pending, weighted])
+        count = len(data) // self._hop
+        if count:
+            frames = data[:count * self._hop].reshape(count, self._hop, self.channels)
+            self._subblocks.extend((frames ** 2).mean(axis=1).sum(axis=1).tolist())
+        self._pending = data[count * self._hop:]
+
+    def integrated_lufs(self) -> float:
+        """Return gated integrated loudness in LUFS (-inf for silence)."""
+        import numpy as np
+
+        z = np.asarray(self._subblocks)
+        if len(z) < 4:
+            if not len(z):
+                return float("-inf")
+            blocks = np.array([z.mean()])
+        else:
+            # 400 ms gating blocks with 75 % overlap
+            blocks = (z[:-3] + z[1:-2] + z[2:-1] + z[3:]) / 4.0
+
+        loudness = -0.691 + 10 * np.log10(blocks + 1e-12)
+        above_abs = blocks[loudness > -70.0]
+        if not len(above_abs):
+            return float("-inf")
+        relative_gate = -0.691 + 10 * np.log10(above_abs.mean()) - 10.0
+        gated = blocks[(loudness > -70.0) & (loudness > relative_gate)]
+        if not len(gated):
+            return float("-inf")
+        return float(-0.691 + 10 * np.log10(gated.mean()))
+
+def _match_channels(block, channels: int):
+    """Up- or down-mix a ``(frames, ch)`` block to *channels*."""
+    import numpy as np
+
+    if block.shape[1] == channels:
+        return block
+    mono = block.mean(axis=1, keepdims=True)
+    return np.repeat(mono, channels, axis=1)
+
+def mix_audio_tracks(
+    instrumental_path: str,
+    vocal_path: str,
+    output_name: Optional[str] = None,
+    *,
+    instrumental_gain: float = 0.7,
+    vocal_gain: float = 0.8,
+    target_lufs: float = -14.0,
+    ceiling: float = 0.95,
+    block_size: int = 65536,
+) -> Optional[str]:
+    """Mix instrumental and vocal tracks into ``{output_name}_complete.wav``.
+
+    Both files are streamed in blocks: the vocals are resampled to the
+    instrumental's rate with a polyphase filter, the shorter track is padded
+    with silence and stereo is preserved.  Loudness and peak are measured in
+    the same pass; the result is then scaled towards *target_lufs* without
+    letting the peak exceed *ceiling*.  Memory use is independent of length.
+    """
+    tmp_path = None
+    try:
+        import tempfile
+        import numpy as np
+        import soundfile as sf
+
+        output_file = f"{output_name}_complete.wav" if output_name else "bestekar_complete_song.wav"
+        out_dir = os.path.dirname(output_file) or "."
+        os.makedirs(out_dir, exist_ok=True)
+
+        with sf.SoundFile(instrumental_path) as inst, sf.SoundFile(vocal_path) as voc:
+            sr = inst.samplerate
+            channels = max(inst.channels, voc.channels)
+            resampler = StreamingResampler(voc.samplerate, sr, voc.channels)
+            meter = LoudnessMeter(sr, channels)
+
+            fd, tmp_path = tempfile.mkstemp(suffix=".wav", dir=out_dir)
+            os.close(fd)
+
+            # Pass 1: mix at unity output gain into a float scratch file
+            vocal_fifo = np.zeros((0, voc.channels), dtype=np.float32)
+            vocal_done = False
+            with sf.SoundFile(tmp_path, "w", samplerate=sr, channels=channels, format="WAV", subtype="FLOAT") as scratch:
+                while True:
+                    inst_block = inst.read(block_size, dtype="float32", always_2d=True)
+                    while not vocal_done and len(vocal_fifo) < block_size:
+                        raw = voc.read(block_size, dtype="float32", always_2d=True)
+                        if len(raw):
+                            vocal_fifo = np.concatenate([vocal_fifo, resampler.process(raw)])
+                        else:
+                            vocal_fifo = np.concatenate([vocal_fifo, resampler.flush()])
+                            vocal_done = True
+
+                    # Pad to the longer track: keep going while either has audio
+                    frames = max(len(inst_block), min(len(vocal_fifo), block_size))
+                    if frames == 0:
+                        break
+
+                    mixed = np.zeros((frames, channels), dtype=np.float32)
+                    mixed[:len(inst_block)] += _match_channels(inst_block, channels) * instrumental_gain
+                    vocal_block, vocal_fifo = vocal_fifo[:frames], vocal_fifo[frames:]
+                    mixed[:len(vocal_block)] += _match_channels(vocal_block, channels) * vocal_gain
+
+                    meter.update(mixed)
+                    scratch.write(mixed)
+
+        # Level control: loudness target, limited by the peak ceiling
+        lufs = meter.integrated_lufs()
+        gain = 10 ** ((target_lufs - lufs) / 20.0) if np.isfinite(lufs) else 1.0
+        if meter.peak > 0:
+            gain = min(gain, ceiling / meter.peak)
+        logger.debug("Mix levels", lufs=f"{lufs:.1f}", peak=f"{meter.peak:.3f}", gain=f"{gain:.3f}")
+
+        # Pass 2: apply gain and write the final file
+        with sf.SoundFile(tmp_path) as scratch, sf.SoundFile(
+            output_file, "w", samplerate=sr, channels=channels, format="WAV", subtype="PCM_16"
+        ) as out:
+            for block in scratch.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+                out.write(np.clip(block * gain, -1.0, 1.0))
+
+        return output_file
+
+    except Exception as e:
+        logger.exception("Audio mixing failed", error=str(e))
+        return None
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+# Modules that must not be loaded by ``import bestekar`` itself
+STARTUP_HEAVY_MODULES = (
+    "torch", "torchaudio", "audiocraft", "bestewk", "celery",
+    "librosa", "edge_tts", "rvc_python", "kivy", "pystray",
+)
+
+def benchmark_import_time(runs: int = 3) -> dict:
+    """Time ``import bestekar`` in fresh interpreters.
+
+    Returns ``seconds``, the best of *runs* import times, and
+    ``heavy_modules``, any of ``STARTUP_HEAVY_MODULES`` that the import
+    pulled in.  The startup budget itself is checked in
+    ``tests/test_startup.py``.
+    """
+    import json
+    import subprocess
+
+    probe = (
+        "import json, sys, time; t = time.perf_counter(); import bestekar; "
+        "print(json.dumps({'seconds': time.perf_counter() - t, 'modules': sorted(sys.modules)}))"
+    )
+    env = dict(os.environ)
+    src_dir = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src_dir, env.get("PYTHONPATH")) if p)
+
+    best = float("inf")
+    heavy: set = set()
+    for _ in range(max(1, runs)):
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, env=env, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        heavy.update(set(STARTUP_HEAVY_MODULES) & set(result["modules"]))
+    logger.info(f"import bestekar: {best:.3f}s")
+    return {"seconds": best, "heavy_modules": sorted(heavy)}
 
 def main():
     """Main entry point - launches system tray application."""
+    pystray, Image = _load_tray()
     
     # Global variables for thread management
     generation_app = None
@@ -1903,7 +3897,8 @@ def main():
 
     _check_disk_space()
 
-    # Optimize threading for detected system
+    # Optimize threading for detected system; the full hardware probe
+    # (torch/CUDA) is left to the first model selection, off the tray's path
     cpu_info = get_cpu_info()
     thread_count = str(min(cpu_info["threads"], 16))  # Cap at 16 threads for stability
     os.environ["OMP_NUM_THREADS"] = thread_count
@@ -1924,13 +3919,21 @@ def main():
     # Launch RVC/model setup in background (keeps UI responsive)
     # ------------------------------------------------------------------
 
-    try:
-        celery_app.send_task('bestewk.app_init')
-        logger.info("Submitted app_init task to ui_actions queue")
-    except Exception as e:
-        # Fallback: run synchronously if Celery broker not available
-        logger.warning(f"Celery not available – running setup inline: {e}")
-        setup_rvc_integration()
+    def submit_app_init():
+        """Import Celery and submit app_init off the startup path."""
+        try:
+            from bestewk import celery_app
+            celery_app.send_task('bestewk.app_init')
+            logger.info("Submitted app_init task to ui_actions queue")
+        except Exception as e:
+            # Fallback: run in this thread if Celery broker not available
+            logger.warning(f"Celery not available – running setup inline: {e}")
+            setup_rvc_integration()
+
+    import threading
+    app_init_thread = threading.Thread(target=submit_app_init, name="AppInit", daemon=True)
+    active_threads.append(app_init_thread)
+    app_init_thread.start()
 
     print("🔧 System tray started. Right-click the tray icon to generate songs.")
 
@@ -2012,6 +4015,7 @@ def main():
     def on_help(icon, item):
         """Open help in web browser using Celery task."""
         try:
+            from bestewk import celery_app
             task = celery_app.send_task('bestewk.open_help')
             logger.info(f"Submitted help task {task.id} to ui_actions queue")
         except Exception as e:
@@ -2027,6 +4031,7 @@ def main():
         
         try:
             # Submit exit task
+            from bestewk import celery_app
             task = celery_app.send_task('bestewk.exit_app')
             logger.info(f"Submitted exit task {task.id} to ui_actions queue")
             
@@ -2060,6 +4065,7 @@ def main():
     def on_view_tasks(icon, item):
         """View all tasks in the generate_music group."""
         try:
+            from bestewk import get_active_generation_tasks
             tasks = get_active_generation_tasks()
             if tasks:
                 print("\n📋 Active Music Generation Tasks:")
@@ -1,15 +1,15 @@
 import os
 import re
+import contextlib
+import threading
 import shutil
 import zipfile
-import requests
 import argparse
 import librosa
 import soundfile as sf
 import yt_dlp
 import numpy as np
 import torch
-from pydub import AudioSegment, silence
 from pathlib import Path
 
 BASE_DIR = os.path.expanduser('~/.bestekar/rvc')
@@ -18,7 +18,8 @@ DIRS = {
     'weights': os.path.join(BASE_DIR, 'weights'),
     'vocals': os.path.join(BASE_DIR, 'vocals'),
     'audio': os.path.join(BASE_DIR, 'audio'),
-    'models': os.path.join(BASE_DIR, 'models')
+    'models': os.path.join(BASE_DIR, 'models'),
+    'cache': os.path.join(BASE_DIR, 'cache')
 }
 for d in DIRS.values():
     os.makedirs(d, exist_ok=True)
@@ -55,30 +56,125 @@ def sanitize_filename(filename):
     sanitized = sanitized.strip('_')
     return sanitized
 
-def download_if_not_exists(urls, path):
-    if os.path.isfile(path):
-        return
-    for url in urls:
-        try:
-            r = requests.get(url, stream=True, timeout=60)
-            if r.status_code == 200:
-                with open(path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                print(f"Downloaded: {path}")
-                return
-            else:
-                print(f"Failed to download from {url} (status {r.status_code})")
-        except Exception as e:
-            print(f"Error downloading from {url}: {e}")
-    raise RuntimeError(f"Could not download {os.path.basename(path)} from any known public mirror.")
+def download_if_not_exists(urls, path, sha256=None):
+    from bestedl import download_file
+    return download_file(urls, path, sha256=sha256)
+
+def ensure_all_models(max_workers=4):
+    from bestedl import download_files
+    download_files([{'urls': MODEL_URLS[key], 'dest': MODEL_PATHS[key]} for key in MODEL_URLS], max_workers=max_workers)
+
+# Bump when a stage's output changes for the same input
+CACHE_VERSIONS = {'audio': 1, 'vocals': 2}
+
+class AudioCache:
+    """Content-addressed cache for intermediate audio under ``DIRS['cache']``.
+
+    Entries live in ``<root>/<stage>/<key><ext>``.  Reads refresh the entry's
+    mtime, and once the cache grows past ``max_bytes`` the least recently used
+    entries are evicted.  File entries are copied in and out so callers may
+    delete or overwrite their working files freely; buffer entries are stored
+    as float WAV so they round-trip without quantization.
+    """
+
+    def __init__(self, root=DIRS['cache'], max_gb=10.0):
+        self.root = root
+        self.max_bytes = int(max_gb * 1024 ** 3)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts):
+        import hashlib
+        return hashlib.sha256('\x00'.join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+    def _path(self, stage, key, ext):
+        return os.path.join(self.root, stage, key + ext)
+
+    def fetch(self, stage, key, dest):
+        cached = self._path(stage, key, os.path.splitext(dest)[1])
+        with self._lock:
+            if not os.path.isfile(cached):
+                return None
+            os.utime(cached)
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        if os.path.exists(dest):
+            os.remove(dest)
+        shutil.copyfile(cached, dest)
+        print(f"Cache hit ({stage}): {os.path.basename(dest)}")
+        return dest
+
+    def put(self, stage, key, path):
+        cached = self._path(stage, key, os.path.splitext(path)[1])
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, cached)
+        self.evict()
+        return cached
+
+    def load(self, stage, key):
+        cached = self._path(stage, key, '.wav')
+        with self._lock:
+            if not os.path.isfile(cached):
+                return None
+            os.utime(cached)
+        print(f"Cache hit ({stage}): {key}")
+        return sf.read(cached, dtype='float32', always_2d=True)[0]
 
-def ensure_all_models():
-    for key in MODEL_URLS:
-        download_if_not_exists(MODEL_URLS[key], MODEL_PATHS[key])
+    def store(self, stage, key, audio, sr):
+        cached = self._path(stage, key, '.wav')
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+        sf.write(tmp, audio, sr, subtype='FLOAT', format='WAV')
+        os.replace(tmp, cached)
+        self.evict()
+        return cached
 
-def download_yt_audio(url, output_dir=DIRS['audio']):
+    def evict(self):
+        with self._lock:
+            entries = []
+            for dirpath, _, files in os.walk(self.root):
+                for name in files:
+                    if name.endswith('.tmp'):
+                        continue
+                    full = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(full)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, full))
+            total = sum(size for _, size, _ in entries)
+            for _, size, full in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(full)
+                    total -= size
+                except OSError:
+                    pass
+
+def file_digest(path):
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def uvr_model_version():
+    path = MODEL_PATHS['uvr']
+    size = os.path.getsize(path) if os.path.isfile(path) else 0
+    return f"{os.path.basename(path)}:{size}"
+
+def cached_stage(cache, stage, key, dest, produce):
+    if cache is not None and cache.fetch(stage, key, dest):
+        return dest
+    path = produce()
+    if cache is not None:
+        cache.put(stage, key, path)
+    return path
+
+def download_yt_audio(url, output_dir=DIRS['audio'], cache=None):
     os.makedirs(output_dir, exist_ok=True)
     ydl_opts = {
         'format': 'bestaudio/best',
@@ -91,88 +187,662 @@ def download_yt_audio(url, output_dir=DIRS['audio']):
         'no_warnings': True
     }
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url)
+        info = ydl.extract_info(url, download=False)
         filename = ydl.prepare_filename(info)
         filename = filename.replace('.webm', '.wav').replace('.m4a', '.wav')
         base = os.path.basename(filename)
         sanitized = sanitize_filename(base)
         sanitized_path = os.path.join(output_dir, sanitized)
-        if sanitized != base:
-            if os.path.exists(sanitized_path):
-                os.remove(sanitized_path)
-            os.rename(filename, sanitized_path)
-        else:
-            sanitized_path = filename
-        return sanitized_path
 
-def run_uvr(input_path, output_dir=DIRS['vocals']):
-    os.makedirs(output_dir, exist_ok=True)
-    import onnxruntime as ort
-    import soundfile as sf
-    import numpy as np
+        def download():
+            ydl.process_ie_result(info, download=True)
+            if sanitized != base:
+                if os.path.exists(sanitized_path):
+                    os.remove(sanitized_path)
+                os.rename(filename, sanitized_path)
+            return sanitized_path
+
+        key = AudioCache.key(info.get('extractor_key'), info.get('id'), CACHE_VERSIONS['audio'])
+        return cached_stage(cache, 'audio', key, sanitized_path, download)
+
+# MDX-Net STFT layout of UVR-MDX-NET-Voc_FT
+UVR_PARAMS = {
+    'n_fft': 7680,
+    'hop': 1024,
+    'dim_f': 3072,
+    'dim_t': 256,
+    'compensate': 1.021,
+}
+
+class MDXSeparator:
+    """Chunked MDX-Net vocal separation with overlap-add.
+
+    The song is cut into fixed windows of ``hop * (dim_t - 1)`` samples,
+    several windows are sent through the ONNX session per ``run`` call and the
+    predictions are cross-faded into a preallocated output buffer, so peak
+    memory depends on the window and batch size rather than the song length.
+    """
+
+    def __init__(self, session, batch_size=4, overlap=0.25, params=None):
+        self.session = session
+        self.batch_size = max(1, int(batch_size))
+        self.overlap = min(max(float(overlap), 0.0), 0.9)
+        self.params = dict(UVR_PARAMS, **(params or {}))
+        model_input = session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = getattr(model_input, 'shape', None) or []
+        if len(shape) == 4 and isinstance(shape[2], int) and isinstance(shape[3], int):
+            self.params['dim_f'], self.params['dim_t'] = shape[2], shape[3]
+        self.n_fft = self.params['n_fft']
+        self.hop = self.params['hop']
+        self.dim_f = self.params['dim_f']
+        self.chunk = self.hop * (self.params['dim_t'] - 1)
+        self.n_bins = self.n_fft // 2 + 1
+        self.window = torch.hann_window(self.n_fft, periodic=True)
+
+    def _stft(self, x):
+        x = torch.from_numpy(x).reshape(-1, self.chunk)
+        spec = torch.stft(x, n_fft=self.n_fft, hop_length=self.hop, window=self.window, center=True, return_complex=True)
+        spec = torch.view_as_real(spec).permute(0, 3, 1, 2)
+        spec = spec.reshape(-1, 2, 2, self.n_bins, spec.shape[-1]).reshape(-1, 4, self.n_bins, spec.shape[-1])
+        return spec[:, :, :self.dim_f].contiguous().numpy()
+
+    def _istft(self, spec):
+        spec = torch.from_numpy(spec)
+        pad = torch.zeros(spec.shape[0], 4, self.n_bins - self.dim_f, spec.shape[-1], dtype=spec.dtype)
+        spec = torch.cat([spec, pad], dim=2)
+        spec = spec.reshape(-1, 2, 2, self.n_bins, spec.shape[-1]).reshape(-1, 2, self.n_bins, spec.shape[-1])
+        spec = torch.view_as_complex(spec.permute(0, 2, 3, 1).contiguous())
+        x = torch.istft(spec, n_fft=self.n_fft, hop_length=self.hop, window=self.window, center=True, length=self.chunk)
+        return x.reshape(-1, 2, self.chunk).numpy()
+
+    def _fade(self, step):
+        fade_len = self.chunk - step
+        weight = np.ones(self.chunk, dtype=np.float32)
+        if fade_len > 0:
+            ramp = np.linspace(0.0, 1.0, fade_len + 2, dtype=np.float32)[1:-1]
+            weight[:fade_len] = ramp
+            weight[-fade_len:] = ramp[::-1]
+        return weight
+
+    def separate(self, audio):
+        # audio: (channels, samples) float32 at 44.1 kHz; returns vocals (2, samples)
+        if audio.shape[0] == 1:
+            audio = np.repeat(audio, 2, axis=0)
+        audio = audio[:2].astype(np.float32)
+        length = audio.shape[1]
+        step = max(1, int(self.chunk * (1.0 - self.overlap)))
+        edge = self.chunk - step  # pad so every real sample is covered by a full fade-in
+        n_windows = max(1, int(np.ceil((length + edge) / step)))
+        padded_len = (n_windows - 1) * step + self.chunk
+        padded = np.zeros((2, padded_len), dtype=np.float32)
+        padded[:, edge:edge + length] = audio
+
+        out = np.zeros((2, padded_len), dtype=np.float32)
+        weight_sum = np.zeros(padded_len, dtype=np.float32)
+        weight = self._fade(step)
+        starts = [i * step for i in range(n_windows)]
+        for b in range(0, len(starts), self.batch_size):
+            batch_starts = starts[b:b + self.batch_size]
+            windows = np.stack([padded[:, st:st + self.chunk] for st in batch_starts])
+            spec = self._stft(windows)
+            pred = self.session.run(None, {self.input_name: spec})[0]
+            vocals = self._istft(np.asarray(pred, dtype=np.float32)) * self.params['compensate']
+            for st, v in zip(batch_starts, vocals):
+                out[:, st:st + self.chunk] += v * weight
+                weight_sum[st:st + self.chunk] += weight
+        out /= np.maximum(weight_sum, 1e-8)
+        return out[:, edge:edge + length]
+
+class UVRSession:
+    """Tuned ONNX Runtime session for the UVR model, built once per process.
+
+    The first build stores the graph-optimized model next to the original,
+    later builds load that file directly.  ``process_urls`` gives each
+    separation worker process its own session with a share of the CPU
+    threads; calls from several threads of one process take turns on it.
+    """
+
+    def __init__(self, model_path=None, intra_threads=None):
+        import onnxruntime as ort
+        self.model_path = model_path or MODEL_PATHS['uvr']
+        self.intra_threads = max(1, int(intra_threads or os.cpu_count() or 1))
+        self.providers = [p for p in ('CUDAExecutionProvider', 'CPUExecutionProvider') if p in ort.get_available_providers()]
+        self._lock = threading.Lock()
+        self._session = self._create_session()
+        print(f"UVR session: {self.intra_threads} thread(s)")
+
+    @property
+    def optimized_path(self):
+        device = 'cuda' if 'CUDAExecutionProvider' in self.providers else 'cpu'
+        return os.path.splitext(self.model_path)[0] + f'.optimized.{device}.onnx'
+
+    def _create_session(self):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = self.intra_threads
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        optimized = self.optimized_path
+        if os.path.isfile(optimized) and os.path.getmtime(optimized) >= os.path.getmtime(self.model_path):
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            return ort.InferenceSession(optimized, sess_options=opts, providers=self.providers)
+        # Several workers may optimize at once; each writes its own file and
+        # renames it into place, so readers never see a partial model
+        tmp = f'{optimized}.{os.getpid()}.{threading.get_ident()}.tmp'
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.optimized_model_filepath = tmp
+        try:
+            session = ort.InferenceSession(self.model_path, sess_options=opts, providers=self.providers)
+            os.replace(tmp, optimized)
+        finally:
+            _remove_quietly(tmp)
+        return session
+
+    @contextlib.contextmanager
+    def session(self):
+        with self._lock:
+            yield self._session
+
+_uvr_session = None
+_uvr_session_lock = threading.Lock()
+
+def get_uvr_session():
+    global _uvr_session
+    with _uvr_session_lock:
+        if _uvr_session is None:
+            _uvr_session = UVRSession()
+        return _uvr_session
+
+UVR_SR = 44100
+
+def load_audio(path, sr=UVR_SR):
     from scipy.signal import resample_poly
-    audio, sr = sf.read(input_path)
-    if sr != 44100:
-        audio = resample_poly(audio, 44100, sr)
-        sr = 44100
-    if audio.ndim == 1:
-        audio = np.expand_dims(audio, axis=1)
-    ort_sess = ort.InferenceSession(MODEL_PATHS['uvr'])
-    audio = audio.T
-    input_feed = {ort_sess.get_inputs()[0].name: audio.astype(np.float32)}
-    pred = ort_sess.run(None, input_feed)[0]
-    vocals = pred[0]
-    vocals = vocals.T
+    audio, file_sr = sf.read(path, dtype='float32', always_2d=True)
+    if file_sr != sr:
+        audio = resample_poly(audio, sr, file_sr, axis=0).astype(np.float32)
+    return audio
+
+def separate_vocals(audio, batch_size=4, overlap=0.25):
+    """Vocals of a ``(N, C)`` float32 buffer at ``UVR_SR`` as ``(N, 2)`` float32."""
+    with get_uvr_session().session() as ort_sess:
+        separator = MDXSeparator(ort_sess, batch_size=batch_size, overlap=overlap)
+        vocals = separator.separate(audio.T)
+    return np.ascontiguousarray(vocals.T, dtype=np.float32)
+
+def separate_file(input_path, batch_size=4, overlap=0.25):
+    return separate_vocals(load_audio(input_path), batch_size, overlap)
+
+def run_uvr(input_path, output_dir=DIRS['vocals'], batch_size=4, overlap=0.25):
+    os.makedirs(output_dir, exist_ok=True)
+    vocals = separate_file(input_path, batch_size, overlap)
     out_path = os.path.join(output_dir, os.path.basename(input_path))
-    sf.write(out_path, vocals, sr, subtype='PCM_16')
+    sf.write(out_path, vocals, UVR_SR, subtype='PCM_16')
     return out_path
 
+def clean_vocals(audio, top_db=25, target_rms=0.1):
+    """Mono mixdown, edge trim and RMS normalization of a float buffer."""
+    mono = audio.mean(axis=1) if audio.ndim > 1 else audio
+    trimmed, _ = librosa.effects.trim(mono, top_db=top_db)
+    rms = np.sqrt(np.mean(np.square(trimmed, dtype=np.float64)))
+    if rms > 0:
+        trimmed = trimmed * (target_rms / rms)
+    return trimmed.astype(np.float32)
+
 def preprocess_audio(input_path, output_dir=DIRS['dataset']):
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, os.path.basename(input_path))
-    y, sr = librosa.load(input_path, sr=44100)
-    trimmed, _ = librosa.effects.trim(y, top_db=25)
-    rms = np.sqrt(np.mean(trimmed**2))
-    normalized = trimmed * (0.1 / rms)
-    sf.write(output_path, normalized, sr, subtype='PCM_16')
+    sf.write(output_path, clean_vocals(load_audio(input_path)), UVR_SR, subtype='PCM_16')
     return output_path
 
-def segment_audio(audio_path, segment_length=10000, overlap=300, output_dir=DIRS['dataset']):
+def detect_nonsilent(audio, sr, min_silence_len=500, silence_thresh=-40.0, seek_step=1):
+    """Millisecond ``[start, end]`` ranges of ``audio`` that are not silent.
+
+    Vectorized port of ``pydub.silence.detect_nonsilent`` for a float buffer
+    in [-1, 1] shaped ``(N,)`` or ``(N, C)``.  A window of ``min_silence_len``
+    ms starting at every ``seek_step`` ms is silent when its RMS over all
+    channels is at or below ``silence_thresh`` dBFS; window energies come
+    from one cumulative sum instead of a per-millisecond Python loop.
+    """
+    frames = audio.reshape(len(audio), -1)
+    length_ms = round(len(frames) * 1000 / sr)
+    if length_ms < min_silence_len:
+        return [[0, length_ms]]
+    energy = np.concatenate(([0.0], np.cumsum(np.square(frames, dtype=np.float64).sum(axis=1))))
+    starts = np.arange(0, length_ms - min_silence_len + 1, seek_step)
+    lo = starts * sr // 1000
+    hi = (starts + min_silence_len) * sr // 1000
+    # windows running past the end are zero-padded, as pydub does
+    mean_sq = (energy[np.minimum(hi, len(frames))] - energy[lo]) / np.maximum((hi - lo) * frames.shape[1], 1)
+    # match pydub: integer RMS of 16-bit samples against the dBFS threshold
+    rms = np.floor(np.sqrt(mean_sq) * 32768.0)
+    silent_starts = starts[rms <= 10 ** (silence_thresh / 20.0) * 32768.0]
+    if not silent_starts.size:
+        return [[0, length_ms]]
+    # pydub merges silent windows unless the gap between them exceeds min_silence_len
+    breaks = np.flatnonzero(np.diff(silent_starts) > min_silence_len)
+    range_starts = silent_starts[np.concatenate(([0], breaks + 1))]
+    range_ends = silent_starts[np.concatenate((breaks, [len(silent_starts) - 1]))] + min_silence_len
+    silent_ranges = list(zip(range_starts.tolist(), range_ends.tolist()))
+    if silent_ranges[0] == (0, length_ms):
+        return []
+    nonsilent, prev_end = [], 0
+    for start, end in silent_ranges:
+        nonsilent.append([prev_end, start])
+        prev_end = end
+    if prev_end != length_ms:
+        nonsilent.append([prev_end, length_ms])
+    if nonsilent[0] == [0, 0]:
+        nonsilent.pop(0)
+    return nonsilent
+
+def split_on_silence(audio, sr, min_silence_len=500, silence_thresh=-40.0, keep_silence=300):
+    length_ms = round(len(audio) * 1000 / sr)
+    ranges = [[start - keep_silence, end + keep_silence] for start, end in detect_nonsilent(audio, sr, min_silence_len, silence_thresh)]
+    for left, right in zip(ranges, ranges[1:]):
+        if right[0] < left[1]:
+            left[1] = (left[1] + right[0]) // 2
+            right[0] = left[1]
+    return [(max(start, 0), min(end, length_ms)) for start, end in ranges]
+
+def segment_buffer(audio, sr, segment_length=10000, overlap=300, output_dir=DIRS['dataset'], prefix='clip'):
     os.makedirs(output_dir, exist_ok=True)
-    audio = AudioSegment.from_wav(audio_path)
-    segments = silence.split_on_silence(audio, min_silence_len=500, silence_thresh=-40, keep_silence=300)
-    final_segments = []
-    for seg in segments:
-        if len(seg) > segment_length:
-            for i in range(0, len(seg), segment_length - overlap):
-                final_segments.append(seg[i:i+segment_length])
+    clips = []
+    for start, end in split_on_silence(audio, sr, min_silence_len=500, silence_thresh=-40, keep_silence=300):
+        if end - start > segment_length:
+            clips.extend((i, min(i + segment_length, end)) for i in range(start, end, segment_length - overlap))
         else:
-            final_segments.append(seg)
-    for i, seg in enumerate(final_segments):
-        seg.export(os.path.join(output_dir, f'clip_{i:04d}.wav'), format='wav')
+            clips.append((start, end))
+    for i, (start, end) in enumerate(clips):
+        clip = audio[start * sr // 1000:end * sr // 1000]
+        sf.write(os.path.join(output_dir, f'{prefix}_{i:04d}.wav'), clip, sr, subtype='PCM_16')
     return output_dir
 
-def process_single_url(url):
-    raw_audio = download_yt_audio(url)
-    vocal_audio = run_uvr(raw_audio)
-    cleaned_audio = preprocess_audio(vocal_audio)
-    segment_audio(cleaned_audio)
-    os.remove(raw_audio)
-    os.remove(vocal_audio)
-    os.remove(cleaned_audio)
+def segment_audio(audio_path, segment_length=10000, overlap=300, output_dir=DIRS['dataset'], prefix='clip'):
+    audio, sr = sf.read(audio_path, dtype='float32')
+    return segment_buffer(audio, sr, segment_length, overlap, output_dir, prefix)
+
+def _vocals_key(raw_audio):
+    return AudioCache.key(file_digest(raw_audio), uvr_model_version(), CACHE_VERSIONS['vocals'])
+
+def build_clips(vocals, prefix='clip', output_dir=DIRS['dataset']):
+    """Trim, normalize and segment separated vocals; only the clips hit disk."""
+    return segment_buffer(clean_vocals(vocals), UVR_SR, output_dir=output_dir, prefix=prefix)
+
+def process_single_url(url, prefix='clip', cache=None):
+    raw_audio = download_yt_audio(url, cache=cache)
+    try:
+        key = _vocals_key(raw_audio) if cache is not None else None
+        vocals = cache.load('vocals', key) if cache is not None else None
+        if vocals is None:
+            vocals = separate_file(raw_audio)
+            if cache is not None:
+                cache.store('vocals', key, vocals, UVR_SR)
+        build_clips(vocals, prefix=prefix)
+    finally:
+        os.remove(raw_audio)
+
+def _remove_quietly(*paths):
+    for path in paths:
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+def _init_uvr_worker(intra_threads):
+    global _uvr_session
+    _uvr_session = UVRSession(intra_threads=intra_threads)
+
+def process_urls(urls, download_workers=4, uvr_workers=None, queue_size=2, cache=None):
+    """Download, separate and segment several URLs as a staged pipeline.
+
+    Downloads run in a thread pool, UVR separation in a bounded process pool
+    and trim/normalize/segmentation on the calling thread.  Separated vocals
+    are handed over as float32 buffers, so only the final clips are written.
+    Bounded queues between the stages keep at most a few raw files on disk
+    and buffers in memory at a time.  A failing URL is reported and skipped;
+    the rest of the run continues.  With an ``AudioCache`` downloads and
+    separated vocals are reused across runs.
+    Returns ``(succeeded, failed)`` where ``failed`` maps URL to the error.
+    """
+    import queue
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+    cpu = os.cpu_count() or 1
+    uvr_workers = max(1, int(uvr_workers or max(1, min(2, cpu // 4))))
+    done_marker = object()
+    downloaded = queue.Queue(maxsize=queue_size)
+    separated = queue.Queue(maxsize=queue_size)
+    failed = {}
+    failed_lock = threading.Lock()
+
+    def fail(url, error, *paths):
+        print(f"Skipping {url}: {error}")
+        with failed_lock:
+            failed[url] = error
+        _remove_quietly(*paths)
+
+    def fetch(index, url):
+        try:
+            raw = download_yt_audio(url, cache=cache)
+        except Exception as e:
+            fail(url, e)
+            return
+        downloaded.put((index, url, raw))
+
+    def download_stage():
+        with ThreadPoolExecutor(max_workers=max(1, download_workers)) as executor:
+            for index, url in enumerate(urls):
+                executor.submit(fetch, index, url)
+        downloaded.put(done_marker)
+
+    def separate_stage(executor):
+        pending = {}
+
+        def hand_off(futures):
+            for fut in futures:
+                index, url, raw, key = pending.pop(fut)
+                try:
+                    vocals = fut.result()
+                    if cache is not None:
+                        cache.store('vocals', key, vocals, UVR_SR)
+                except Exception as e:
+                    fail(url, e, raw)
+                    continue
+                _remove_quietly(raw)
+                separated.put((index, url, vocals))
+
+        try:
+            while True:
+                item = downloaded.get()
+                if item is done_marker:
+                    break
+                index, url, raw = item
+                try:
+                    key = _vocals_key(raw) if cache is not None else None
+                    vocals = cache.load('vocals', key) if cache is not None else None
+                    if vocals is not None:
+                        _remove_quietly(raw)
+                        separated.put((index, url, vocals))
+                        continue
+                    if len(pending) >= uvr_workers:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        hand_off(done)
+                    pending[executor.submit(separate_file, raw)] = (index, url, raw, key)
+                except Exception as e:
+                    fail(url, e, raw)
+            hand_off(list(pending))
+        finally:
+            separated.put(done_marker)
+
+    succeeded = []
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=uvr_workers, mp_context=ctx, initializer=_init_uvr_worker, initargs=(max(1, cpu // uvr_workers),)) as executor:
+        stages = [threading.Thread(target=download_stage, daemon=True), threading.Thread(target=separate_stage, args=(executor,), daemon=True)]
+        for stage in stages:
+            stage.start()
+        while True:
+            item = separated.get()
+            if item is done_marker:
+                break
+            index, url, vocals = item
+            try:
+                build_clips(vocals, prefix=f'clip_{index:03d}')
+                succeeded.append(url)
+                print(f"Processed {url}")
+            except Exception as e:
+                fail(url, e)
+        for stage in stages:
+            stage.join()
+    return succeeded, failed
+
+def stage_fingerprint(*parts):
+    return AudioCache.key(*parts)
+
+class StageLog:
+    """Completion markers for the training stages in ``logs/<model>/stages.json``.
+
+    A stage is skipped when it last completed with the same input
+    fingerprint.  Fingerprints chain from one stage to the next, so a change
+    to the dataset or to a stage's settings re-runs it and everything after.
+    """
+
+    def __init__(self, logs_dir):
+        import json
+        self.path = os.path.join(logs_dir, 'stages.json')
+        try:
+            with open(self.path) as f:
+                self.stages = json.load(f)
+        except (OSError, ValueError):
+            self.stages = {}
+
+    def is_done(self, stage, fingerprint):
+        return self.stages.get(stage, {}).get('fingerprint') == fingerprint
+
+    def mark(self, stage, fingerprint):
+        import json
+        import time
+        self.stages[stage] = {'fingerprint': fingerprint, 'completed_at': time.time()}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.stages, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def run(self, stage, fingerprint, fn, *args, **kwargs):
+        if self.is_done(stage, fingerprint):
+            print(f"Skipping {stage}: inputs unchanged")
+            return False
+        print(f"Running {stage}...")
+        fn(*args, **kwargs)
+        self.mark(stage, fingerprint)
+        return True
+
+def plan_training_resources(per_process_gb=1.5):
+    """Process count for extraction and torch threads for training."""
+    cpu = os.cpu_count() or 1
+    n_p = cpu
+    try:
+        import psutil
+        n_p = min(cpu, max(1, int(psutil.virtual_memory().available / 1024 ** 3 // per_process_gb)))
+    except ImportError:
+        pass
+    return {'n_p': n_p, 'extract_threads': max(1, cpu // n_p), 'train_threads': cpu}
+
+@contextlib.contextmanager
+def torch_threads(n):
+    previous = torch.get_num_threads()
+    saved = {k: os.environ.get(k) for k in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS')}
+    torch.set_num_threads(n)
+    for k in saved:
+        os.environ[k] = str(n)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+def latest_checkpoint(logs_dir, prefix='G_'):
+    files = [os.path.join(logs_dir, f) for f in os.listdir(logs_dir) if f.startswith(prefix) and f.endswith('.pth')]
+    return max(files, key=os.path.getmtime) if files else None
+
+def _snapshot(root):
+    found = {}
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            path = os.path.join(dirpath, f)
+            found[path] = os.stat(path).st_mtime_ns
+    return found
+
+def _changed(before, after):
+    """Files created or rewritten between two snapshots."""
+    return {path for path, mtime in after.items() if before.get(path) != mtime}
+
+def _adopt_artifacts(produced, stems):
+    """Rename index-named RVC outputs to ``<stem>_<name>`` and return the new paths.
+
+    RVC names every output after the position of its input in the sorted
+    input directory (``0_0.wav``, ``3_1.wav.npy``), so ``stems`` lists the
+    staged inputs in that order.  The prefix keeps names aligned across the
+    gt_wavs/f0/feature directories while stopping later runs, which count
+    from 0 again, from overwriting them.
+    """
+    adopted = set()
+    for path in produced:
+        head = os.path.basename(path).split('_', 1)[0]
+        if not head.isdigit() or int(head) >= len(stems):
+            continue
+        target = os.path.join(os.path.dirname(path), f"{stems[int(head)]}_{os.path.basename(path)}")
+        os.replace(path, target)
+        adopted.add(target)
+    return adopted
+
+class ClipManifest:
+    """Per-clip record of extracted training artifacts in ``logs/<model>/clips.json``.
+
+    Clips are keyed by content hash.  Each entry lists the files extraction
+    produced for it, found by diffing ``logs/<model>`` around the run and
+    renamed with a prefix derived from the hash (see ``_adopt_artifacts``).  ``settings`` holds the sample
+    rate and f0 method; changing either invalidates every entry.
+    """
+
+    def __init__(self, logs_dir):
+        import json
+        self.path = os.path.join(logs_dir, 'clips.json')
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.settings = data.get('settings', {})
+        self.clips = data.get('clips', {})
+
+    def scan(self, dataset_dir):
+        return {file_digest(os.path.join(dataset_dir, name)): name for name in sorted(os.listdir(dataset_dir)) if name.endswith('.wav')}
+
+    def digest(self):
+        return stage_fingerprint(*sorted(self.clips))
+
+    def record(self, clips, stems, produced):
+        for digest, name in clips.items():
+            stem = stems[digest]
+            self.clips[digest] = {'name': name, 'artifacts': sorted(f for f in produced if os.path.basename(f).startswith(stem + '_'))}
+
+    def complete(self, digests):
+        """True when every clip in ``digests`` still has all of its artifacts."""
+        for digest in digests:
+            artifacts = self.clips.get(digest, {}).get('artifacts')
+            if not artifacts or not all(os.path.isfile(f) and os.path.getsize(f) > 0 for f in artifacts):
+                return False
+        return True
+
+    def forget(self, digests):
+        for digest in digests:
+            for path in self.clips.pop(digest, {}).get('artifacts', []):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def save(self):
+        import json
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'settings': self.settings, 'clips': self.clips}, f, indent=2)
+        os.replace(tmp, self.path)
+
+def update_index(index_file, feature_files):
+    """Append new HuBERT feature vectors to an existing FAISS index."""
+    import faiss
+    index = faiss.read_index(index_file)
+    feats = np.concatenate([np.load(f) for f in feature_files]).astype(np.float32)
+    index.add(feats)
+    tmp = index_file + '.tmp'
+    faiss.write_index(index, tmp)
+    os.replace(tmp, index_file)
+    return index.ntotal
 
 def train_rvc_model(dataset_dir, model_name, sample_rate='40k', f0method='rmvpe', epochs=50, batch_size=7):
     from rvc.lib.train import preprocess_all, extract_f0, extract_feature, train, train_index
     logs_dir = os.path.join('logs', model_name)
     os.makedirs(logs_dir, exist_ok=True)
-    preprocess_all(sr=sample_rate, data_path=dataset_dir, n_p=os.cpu_count() // 2)
-    extract_f0(data_path=dataset_dir, sr=sample_rate, n_p=os.cpu_count() // 2, method=f0method)
-    extract_feature(data_path=dataset_dir, sr=sample_rate, n_p=os.cpu_count() // 2)
-    train(experiment_name=model_name, data_path=dataset_dir, sample_rate=sample_rate, f0=1, batch_size=batch_size, total_epoch=epochs, save_every_epoch=10, pretrained_G=MODEL_PATHS['pretrained_g'], pretrained_D=MODEL_PATHS['pretrained_d'])
-    train_index(experiment_name=model_name, data_path=dataset_dir)
-    model_files = sorted([os.path.join(logs_dir, f) for f in os.listdir(logs_dir) if f.startswith('G_') and f.endswith('.pth')], key=os.path.getmtime)
-    latest_model = model_files[-1] if model_files else None
+    log = StageLog(logs_dir)
+    manifest = ClipManifest(logs_dir)
+    plan = plan_training_resources()
+    print(f"Training plan: {plan['n_p']} extraction process(es) x {plan['extract_threads']} thread(s), {plan['train_threads']} training thread(s)")
+
+    def extract(data_path):
+        with torch_threads(plan['extract_threads']):
+            preprocess_all(sr=sample_rate, data_path=data_path, n_p=plan['n_p'])
+            extract_f0(data_path=data_path, sr=sample_rate, n_p=plan['n_p'], method=f0method)
+            extract_feature(data_path=data_path, sr=sample_rate, n_p=plan['n_p'])
+
+    def extract_clips(clips):
+        """Extract ``clips`` (digest -> file name) staged under their hash; return the artifacts."""
+        incoming = os.path.join(logs_dir, 'incoming')
+        shutil.rmtree(incoming, ignore_errors=True)
+        os.makedirs(incoming)
+        # Staged names are known and unique, so RVC's index-named outputs map
+        # back to clips regardless of what else sits in dataset_dir
+        stems = {d: d[:16] for d in clips}
+        for d, name in clips.items():
+            shutil.copyfile(os.path.join(dataset_dir, name), os.path.join(incoming, stems[d] + '.wav'))
+        before = _snapshot(logs_dir)
+        try:
+            extract(incoming)
+        finally:
+            shutil.rmtree(incoming, ignore_errors=True)
+        produced = _adopt_artifacts(_changed(before, _snapshot(logs_dir)), sorted(stems.values()))
+        manifest.record(clips, stems, produced)
+        return produced
+
+    settings = {'sample_rate': sample_rate, 'f0method': f0method}
+    current = manifest.scan(dataset_dir)
+    new = {d: n for d, n in current.items() if d not in manifest.clips}
+    removed = [d for d in manifest.clips if d not in current]
+    full = manifest.settings != settings or not manifest.clips or not manifest.complete(list(manifest.clips))
+    produced = set()
+    if not full:
+        manifest.forget(removed)
+        if new:
+            print(f"Extracting features for {len(new)} new clip(s), reusing {len(current) - len(new)}")
+            produced = extract_clips(new)
+        if not manifest.complete(list(current)):
+            print("Some clips are missing extracted artifacts; re-extracting all clips")
+            full = True
+    if full:
+        print(f"Extracting features for all {len(current)} clip(s)")
+        manifest.forget(list(manifest.clips))
+        manifest.settings = settings
+        produced = extract_clips(current)
+    manifest.save()
+
+    train_fp = stage_fingerprint(manifest.digest(), sample_rate, f0method, epochs, batch_size)
+    resume_from = latest_checkpoint(logs_dir)
+    if not resume_from:
+        log.stages.pop('train', None)
+    elif not log.is_done('train', train_fp):
+        # RVC's trainer picks up the newest G_/D_ checkpoint in logs/<model> on its own
+        print(f"Resuming training from {os.path.basename(resume_from)}")
+    with torch_threads(plan['train_threads']):
+        log.run('train', train_fp, train, experiment_name=model_name, data_path=dataset_dir, sample_rate=sample_rate, f0=1, batch_size=batch_size, total_epoch=epochs, save_every_epoch=10, pretrained_G=MODEL_PATHS['pretrained_g'], pretrained_D=MODEL_PATHS['pretrained_d'])
+
     index_file = os.path.join(logs_dir, f'added_{model_name}.index')
+    index_fp = stage_fingerprint(manifest.digest(), sample_rate, f0method)
+    new_features = [f for f in produced if f.endswith('.npy') and 'feature' in os.path.dirname(f)]
+    if not os.path.isfile(index_file) or full or removed:
+        log.stages.pop('train_index', None)
+    elif new_features and not log.is_done('train_index', index_fp):
+        try:
+            total = update_index(index_file, new_features)
+            log.mark('train_index', index_fp)
+            print(f"Added {len(new_features)} feature file(s) to index ({total} vectors)")
+        except Exception as e:
+            print(f"Incremental index update failed ({e}); rebuilding")
+    log.run('train_index', index_fp, train_index, experiment_name=model_name, data_path=dataset_dir)
+    latest_model = latest_checkpoint(logs_dir)
     if not latest_model or not os.path.isfile(index_file):
         raise RuntimeError('Training failed - output files not found')
     return latest_model, index_file
@@ -201,12 +871,19 @@ def main():
     parser.add_argument('-m', '--model_name', default='turkish_default', help='Model name')
     parser.add_argument('-e', '--epochs', type=int, default=50, help='Training epochs')
     parser.add_argument('-b', '--batch_size', type=int, default=7, help='Batch size')
+    parser.add_argument('--uvr_sessions', type=int, default=None, help='Parallel UVR workers (default: from CPU count)')
+    parser.add_argument('--download_workers', type=int, default=4, help='Parallel downloads')
+    parser.add_argument('--cache_gb', type=float, default=10.0, help='Size cap of the intermediate audio cache')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', help='Ignore and do not fill the audio cache')
     args = parser.parse_args()
 
     ensure_all_models()
-    for url in args.urls:
-        process_single_url(url)
-    torch.set_num_threads(1)
+    cache = None if args.no_cache else AudioCache(max_gb=args.cache_gb)
+    succeeded, failed = process_urls(args.urls, download_workers=args.download_workers, uvr_workers=args.uvr_sessions, cache=cache)
+    if failed:
+        print(f"{len(failed)} of {len(args.urls)} URL(s) failed: {', '.join(failed)}")
+    if not succeeded:
+        raise RuntimeError('No URL could be processed')
     model_path, index_path = train_rvc_model(DIRS['dataset'], args.model_name, epochs=args.epochs, batch_size=args.batch_size)
     zip_path = create_final_zip(model_path, index_path, args.model_name)
     print(f'Success! Model packaged at: {zip_path}')
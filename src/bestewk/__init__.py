@@ -15,7 +15,7 @@ from datetime import datetime
 # Celery imports
 from celery import Celery
 from celery.result import AsyncResult
-from celery.signals import worker_ready, worker_shutdown
+from celery.signals import worker_ready, worker_shutdown, worker_process_init
 
 # Logging
 from loguru import logger
@@ -53,17 +53,93 @@ _configure_worker_logging()
 # Celery App Configuration
 # --------------------------------------------------
 
+BESTEWK_DIR = Path.home() / ".bestekar"
+
+def resolve_broker_config() -> Dict[str, Any]:
+    """Resolve broker/result backend settings from the environment.
+    
+    ``BESTEWK_BROKER`` selects the transport:
+    
+    - ``memory`` (default): in-process only, single solo worker
+    - ``filesystem``: spool directory under ``~/.bestekar/broker``, results
+      stored under ``~/.bestekar/results``
+    - ``sqlite``: SQLite database under ``~/.bestekar`` (needs SQLAlchemy)
+    - any other value is used as a broker URL as-is; results then go to
+      the shared ``~/.bestekar/results`` directory unless overridden
+    
+    ``BESTEWK_BACKEND`` overrides the result backend URL.  The filesystem and
+    SQLite options need no external service, are shared between the tray
+    and any number of worker processes on the host and survive restarts.
+    """
+    broker = os.getenv("BESTEWK_BROKER", "memory").strip() or "memory"
+    backend = os.getenv("BESTEWK_BACKEND", "").strip() or None
+    
+    config: Dict[str, Any] = {
+        'broker': broker,
+        'backend': backend,
+        'transport_options': {},
+        'multiprocess': True,
+    }
+    
+    if broker == "sqlite":
+        try:
+            import sqlalchemy  # noqa: F401
+        except ImportError:
+            logger.warning("SQLAlchemy not installed, falling back to filesystem broker")
+            broker = "filesystem"
+        else:
+            BESTEWK_DIR.mkdir(parents=True, exist_ok=True)
+            config['broker'] = f"sqla+sqlite:///{(BESTEWK_DIR / 'broker.sqlite').as_posix()}"
+            config['backend'] = backend or f"db+sqlite:///{(BESTEWK_DIR / 'results.sqlite').as_posix()}"
+            return config
+    
+    if broker == "filesystem":
+        queue_dir = BESTEWK_DIR / "broker" / "queue"
+        processed_dir = BESTEWK_DIR / "broker" / "processed"
+        results_dir = BESTEWK_DIR / "results"
+        for directory in (queue_dir, processed_dir, results_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        config['broker'] = "filesystem://"
+        config['backend'] = backend or results_dir.as_uri()
+        config['transport_options'] = {
+            'data_folder_in': str(queue_dir),
+            'data_folder_out': str(queue_dir),
+            'processed_folder': str(processed_dir),
+            'store_processed': False,
+        }
+        return config
+    
+    if broker == "memory":
+        config['broker'] = "memory://"
+        config['backend'] = backend or "cache+memory://"
+        config['multiprocess'] = False
+        return config
+    
+    # Explicit broker URL: tray and workers are separate processes, so the
+    # in-memory result backend would never show them each other's results
+    if backend is None:
+        results_dir = BESTEWK_DIR / "results"
+        results_dir.mkdir(parents=True, exist_ok=True)
+        backend = results_dir.as_uri()
+    config['backend'] = backend
+    return config
+
 def create_celery_app() -> Celery:
     """Create and configure Celery app for task management."""
     
-    # Create Celery app with memory-based broker for simplicity
+    broker_config = resolve_broker_config()
+    
+    # Memory broker by default; filesystem/SQLite brokers via BESTEWK_BROKER
     celery_app = Celery(
         'bestewk',
-        broker='memory://',
-        backend='cache+memory://',
+        broker=broker_config['broker'],
+        backend=broker_config['backend'],
         include=['bestewk']
     )
     
+    if broker_config['transport_options']:
+        celery_app.conf.broker_transport_options = broker_config['transport_options']
+    
     # Celery configuration optimized for music generation
     celery_app.conf.update(
         # Serialization
@@ -84,6 +160,11 @@ def create_celery_app() -> Celery:
         # Routing
         task_routes={
             'bestewk.generate_music': {'queue': 'generate_music'},
+            'bestewk.generate_music_batch': {'queue': 'generate_music'},
+            'bestewk.stage_instrumental': {'queue': 'generate_music'},
+            'bestewk.stage_tts': {'queue': 'vocals'},
+            'bestewk.stage_rvc': {'queue': 'vocals'},
+            'bestewk.stage_mix': {'queue': 'mix'},
             'bestewk.open_help': {'queue': 'ui_actions'},
             'bestewk.exit_app': {'queue': 'ui_actions'},
         },
@@ -110,13 +191,301 @@ def create_celery_app() -> Celery:
 # Global Celery app instance
 celery_app = create_celery_app()
 
+# --------------------------------------------------
+# Resource-Aware Scheduling
+# --------------------------------------------------
+
+def scheduler_enabled() -> bool:
+    """Return True if resource-aware admission is enabled via BESTEWK_SCHEDULER."""
+    return os.getenv("BESTEWK_SCHEDULER", "0") in {"1", "true", "True"}
+
+def _detect_memory_budget_gb() -> float:
+    """Memory available to generation jobs: VRAM on CUDA hosts, otherwise RAM."""
+    override = os.getenv("BESTEWK_MEMORY_BUDGET_GB")
+    if override:
+        try:
+            return max(0.5, float(override))
+        except ValueError:
+            logger.warning(f"Invalid BESTEWK_MEMORY_BUDGET_GB: {override}")
+    
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch.cuda.get_device_properties(0).total_memory / (1024**3) * 0.9
+    except Exception:
+        pass
+    
+    try:
+        import psutil
+        return psutil.virtual_memory().total / (1024**3) * 0.85
+    except Exception:
+        return 8.0
+
+def plan_worker_capacity(min_threads_per_job: int = 4) -> Dict[str, Any]:
+    """Work out how many generation jobs fit on this host at once.
+    
+    The job count is bounded by the memory budget (using the smallest
+    MusicGen footprint) and by giving every job at least
+    *min_threads_per_job* CPU threads.  Each slot owns a disjoint range of
+    logical CPUs.
+    """
+    threads = os.cpu_count() or 1
+    budget_gb = _detect_memory_budget_gb()
+    
+    try:
+        from bestekar import estimate_generation_footprint_gb
+        smallest_job_gb = estimate_generation_footprint_gb("small", 30)
+    except Exception:
+        smallest_job_gb = 2.5
+    
+    max_jobs = max(1, min(threads // max(1, min_threads_per_job), int(budget_gb // smallest_job_gb)))
+    override = os.getenv("BESTEWK_MAX_JOBS")
+    if override and override.isdigit():
+        max_jobs = max(1, int(override))
+    threads_per_job = max(1, threads // max_jobs)
+    
+    return {
+        'max_jobs': max_jobs,
+        'threads_per_job': threads_per_job,
+        'memory_budget_gb': budget_gb,
+        'total_threads': threads,
+    }
+
+class ResourceScheduler:
+    """Cross-process admission control for generation jobs.
+    
+    Worker processes record running jobs in a small SQLite ledger under
+    ``~/.bestekar``.  A job is admitted only when its estimated footprint
+    fits the remaining memory budget and a CPU slot is free; the slot's
+    thread range is then applied with ``torch.set_num_threads`` (and CPU
+    affinity where supported).  Entries from dead processes are reclaimed.
+    
+    MusicGen models stay cached in a worker after its job ends, so on
+    release each process also records the size of its resident models.
+    Those count against the budget for jobs in other processes until that
+    process runs a job again, whose own reservation covers them.
+    """
+    
+    def __init__(self, plan: Optional[Dict[str, Any]] = None, ledger_path: Optional[Path] = None):
+        self.plan = plan or plan_worker_capacity()
+        self.ledger_path = ledger_path or (BESTEWK_DIR / "scheduler.sqlite")
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "task_id TEXT PRIMARY KEY, pid INTEGER, memory_gb REAL, slot INTEGER, started REAL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS resident (pid INTEGER PRIMARY KEY, memory_gb REAL)")
+    
+    def _connect(self):
+        import sqlite3
+        return sqlite3.connect(str(self.ledger_path), timeout=30, isolation_level=None)
+    
+    @staticmethod
+    def _reap_dead(conn) -> None:
+        try:
+            import psutil
+        except ImportError:
+            return
+        for task_id, pid in conn.execute("SELECT task_id, pid FROM jobs").fetchall():
+            if not psutil.pid_exists(pid):
+                conn.execute("DELETE FROM jobs WHERE task_id = ?", (task_id,))
+        for (pid,) in conn.execute("SELECT pid FROM resident").fetchall():
+            if not psutil.pid_exists(pid):
+                conn.execute("DELETE FROM resident WHERE pid = ?", (pid,))
+    
+    def try_acquire(self, task_id: str, memory_gb: float) -> Optional[int]:
+        """Reserve a slot for *task_id*; return the slot index or None if full."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")  # serialize admission across processes
+            self._reap_dead(conn)
+            rows = conn.execute("SELECT slot, memory_gb FROM jobs").fetchall()
+            used_slots = {row[0] for row in rows}
+            used_gb = sum(row[1] for row in rows)
+            # Models cached by idle workers; a busy worker's job already covers its own
+            used_gb += conn.execute(
+                "SELECT COALESCE(SUM(memory_gb), 0) FROM resident "
+                "WHERE pid != ? AND pid NOT IN (SELECT pid FROM jobs)",
+                (os.getpid(),)
+            ).fetchone()[0]
+            free_slots = [i for i in range(self.plan['max_jobs']) if i not in used_slots]
+            
+            # An idle host always admits one job, even if it exceeds the budget
+            fits = not rows or used_gb + memory_gb <= self.plan['memory_budget_gb']
+            if not free_slots or not fits:
+                conn.execute("ROLLBACK")
+                return None
+            
+            slot = free_slots[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)",
+                (task_id, os.getpid(), memory_gb, slot, time.time())
+            )
+            conn.execute("COMMIT")
+            return slot
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def acquire(self, task_id: str, memory_gb: float, poll_interval: float = 2.0,
+                on_wait=None) -> int:
+        """Block until *task_id* is admitted; return its slot index."""
+        while True:
+            slot = self.try_acquire(task_id, memory_gb)
+            if slot is not None:
+                self.apply_thread_slice(slot)
+                logger.info(f"Task {task_id} admitted to slot {slot} ({memory_gb:.1f}GB)")
+                return slot
+            if on_wait is not None:
+                on_wait()
+            time.sleep(poll_interval)
+    
+    def release(self, task_id: str, resident_gb: float = 0.0) -> None:
+        """Free the slot held by *task_id*.
+        
+        *resident_gb* is the memory this process keeps holding afterwards
+        (its cached models) and stays reserved until the process exits.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM jobs WHERE task_id = ?", (task_id,))
+            self._set_resident(conn, resident_gb)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def record_resident(self, resident_gb: float) -> None:
+        """Record the memory held by this process's cached models outside any job."""
+        conn = self._connect()
+        try:
+            self._set_resident(conn, resident_gb)
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _set_resident(conn, resident_gb: float) -> None:
+        if resident_gb > 0:
+            conn.execute("INSERT OR REPLACE INTO resident VALUES (?, ?)", (os.getpid(), resident_gb))
+        else:
+            conn.execute("DELETE FROM resident WHERE pid = ?", (os.getpid(),))
+    
+    def apply_thread_slice(self, slot: int) -> List[int]:
+        """Pin this process to the CPU range owned by *slot*."""
+        per_job = self.plan['threads_per_job']
+        cpus = list(range(slot * per_job, min((slot + 1) * per_job, self.plan['total_threads'])))
+        try:
+            import torch
+            torch.set_num_threads(max(1, len(cpus)))
+        except Exception:
+            pass
+        if cpus and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, cpus)
+            except OSError as e:
+                logger.debug(f"Could not set CPU affinity: {e}")
+        return cpus
+    
+    def running_jobs(self) -> List[Dict[str, Any]]:
+        """Return the jobs currently recorded in the ledger."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT task_id, pid, memory_gb, slot, started FROM jobs").fetchall()
+        finally:
+            conn.close()
+        return [
+            {'task_id': r[0], 'pid': r[1], 'memory_gb': r[2], 'slot': r[3], 'started': r[4]}
+            for r in rows
+        ]
+
+def _resident_models_gb() -> float:
+    """Size of the MusicGen models cached in this process."""
+    if 'bestekar' not in sys.modules:
+        return 0.0  # nothing can be cached before the generator was imported
+    try:
+        from bestekar import get_model_registry
+        return get_model_registry().stats()['total_gb']
+    except Exception:
+        return 0.0
+
+_scheduler: Optional[ResourceScheduler] = None
+
+def get_scheduler() -> ResourceScheduler:
+    """Return this process's scheduler handle, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ResourceScheduler()
+    return _scheduler
+
+class scheduled_job:
+    """Context manager that holds a scheduler slot while a job runs.
+    
+    A no-op unless the scheduler is enabled.
+    """
+    
+    def __init__(self, task, task_id: str, memory_gb: float):
+        self.task = task
+        self.task_id = task_id
+        self.memory_gb = memory_gb
+        self.active = scheduler_enabled() and bool(task_id)
+    
+    def __enter__(self):
+        if self.active:
+            def _report_waiting():
+                self.task.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'stage': 'queued',
+                        'progress': 5,
+                        'message': f'Waiting for resources ({self.memory_gb:.1f}GB)...',
+                        'task_id': self.task_id
+                    }
+                )
+            get_scheduler().acquire(self.task_id, self.memory_gb, on_wait=_report_waiting)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self.active:
+            get_scheduler().release(self.task_id, _resident_models_gb())
+        return False
+
+def _instrumental_plan_meta(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Task meta for a generation plan.
+    
+    The plan only predicts the MusicGen stage, so its prediction and
+    deadline verdict are reported as the instrumental stage's; TTS, RVC and
+    mixing in Complete Song mode are not included.  ``instrumental_eta`` is
+    filled in by :func:`_mark_admitted` once the scheduler admits the job.
+    """
+    return {
+        'model': plan['model'],
+        'predicted_seconds': plan['predicted_seconds'],
+        'instrumental_eta': None,
+        'deadline_seconds': plan['deadline_seconds'],
+        'instrumental_meets_deadline': plan['meets_deadline'],
+    }
+
+def _mark_admitted(plan_meta: Dict[str, Any], plan: Dict[str, Any]):
+    """Set the instrumental ETA from the moment the job actually starts."""
+    if plan_meta and plan['predicted_seconds']:
+        plan_meta['instrumental_eta'] = time.time() + plan['predicted_seconds']
+
 # --------------------------------------------------
 # Task Definitions
 # --------------------------------------------------
 
 @celery_app.task(bind=True, name='bestewk.generate_music', queue='generate_music')
 def generate_music_task(self, lyrics_text: str, style_text: str, duration: int, 
-                       rvc_model_path: str = "", mode: str = "Complete Song (RVC)"):
+                       rvc_model_path: str = "", mode: str = "Complete Song (RVC)",
+                       progressive: bool = False, deadline_seconds: Optional[float] = None):
     """
     Celery task for music generation.
     
@@ -126,6 +495,11 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
         duration: Duration in seconds
         rvc_model_path: Path to RVC model (optional)
         mode: Generation mode
+        progressive: Write the instrumental as a growing, playable WAV and
+            report its path and playable length in the task meta
+        deadline_seconds: Latency budget; the largest model and CFG mode
+            predicted to finish in time are used, and the prediction is
+            reported in the task meta
     
     Returns:
         Dict with generation results
@@ -134,6 +508,15 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
     start_time = time.time()
     
     try:
+        # Plan model and parameters against the latency budget; vocals-only
+        # jobs don't run MusicGen
+        plan = {'model': None, 'overrides': {}}
+        plan_meta = {}
+        if mode != "Vocals Only (RVC)":
+            from bestekar import plan_generation
+            plan = plan_generation(duration, deadline_seconds)
+            plan_meta = _instrumental_plan_meta(plan)
+        
         # Update task state to show progress
         self.update_state(
             state='PROGRESS',
@@ -141,7 +524,8 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                 'stage': 'initializing',
                 'progress': 5,
                 'message': 'Starting music generation...',
-                'task_id': task_id
+                'task_id': task_id,
+                **plan_meta
             }
         )
         
@@ -150,24 +534,63 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
         
         # Import here to avoid circular imports and ensure worker isolation
         from bestekar import TurkishSongGenerator, TurkishSongGeneratorWithRVC, RVCSinger
+        from bestekar import get_model_registry
         
         # Create output directory
         output_dir = Path("music")
         output_dir.mkdir(exist_ok=True)
         
+        # Generators share the process-wide model registry, so a warm worker
+        # skips MusicGen.get_pretrained entirely
+        cached_models = get_model_registry().stats()['models']
+        logger.info(f"Cached MusicGen models: {cached_models or 'none'}")
+        
         # Progress update
         self.update_state(
             state='PROGRESS',
             meta={
                 'stage': 'setup',
                 'progress': 10,
-                'message': 'Setting up AI models...',
-                'task_id': task_id
+                'message': 'Setting up AI models...' if not cached_models else 'Reusing cached AI models...',
+                'cached_models': cached_models,
+                'task_id': task_id,
+                **plan_meta
             }
         )
         
+        # Output names derive from the task id so a redelivered task (acks_late
+        # + reject_on_worker_lost) finds the chunks saved by the crashed run
+        import zlib
+        output_stem = f"bestewk_{task_id}" if task_id else f"bestewk_{int(time.time())}"
+        seed = zlib.crc32(output_stem.encode()) & 0x7FFFFFFF
+        redelivered = bool((self.request.delivery_info or {}).get('redelivered'))
+        if redelivered or self.request.retries:
+            logger.info(f"Task {task_id} was redelivered, resuming from saved chunks if any")
+        
         output_file = None
         
+        def _progressive_callback(preview_file: str, stage: str, message: str):
+            """Build a callback that reports the playable preview length."""
+            if not progressive:
+                return None
+            
+            def _report(playable_seconds: float):
+                fraction = min(playable_seconds / max(duration, 1), 1.0)
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'stage': stage,
+                        'progress': int(30 + fraction * 60),
+                        'message': f'{message} ({int(playable_seconds)}s playable)',
+                        'preview_file': preview_file,
+                        'playable_seconds': playable_seconds,
+                        'task_id': task_id,
+                        **plan_meta
+                    }
+                )
+            
+            return _report
+        
         async def _run_generation():
             """Async wrapper for generation tasks."""
             nonlocal output_file
@@ -182,12 +605,13 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                         'stage': 'rvc_setup',
                         'progress': 15,
                         'message': 'Initializing RVC pipeline...',
-                        'task_id': task_id
+                        'task_id': task_id,
+                        **plan_meta
                     }
                 )
                 
                 generator = TurkishSongGeneratorWithRVC(
-                    model_name=None,  # Use automatic resource-based selection
+                    model_name=plan['model'],  # Resource/deadline-based selection
                     rvc_model_path=rvc_model_path if rvc_model_path else None
                 )
                 
@@ -198,7 +622,8 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                         'stage': 'generating',
                         'progress': 25,
                         'message': 'Generating complete song with vocals...',
-                        'task_id': task_id
+                        'task_id': task_id,
+                        **plan_meta
                     }
                 )
                 
@@ -206,8 +631,17 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                     lyrics=lyrics_text,
                     style=style_text,
                     duration=duration,
-                    output_name=f"music/bestewk_rvc_{int(time.time())}",
-                    add_vocals=True
+                    output_name=f"music/{output_stem}_rvc",
+                    add_vocals=True,
+                    resume=True,
+                    seed=seed,
+                    stream=progressive,
+                    progress_callback=_progressive_callback(
+                        f"music/{output_stem}_rvc_instrumental.wav",
+                        'generating',
+                        'Generating instrumental backing track...'
+                    ),
+                    generation_overrides=plan['overrides']
                 )
                 
             elif mode == "Instrumental Only":
@@ -219,11 +653,12 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                         'stage': 'instrumental',
                         'progress': 20,
                         'message': 'Generating instrumental track...',
-                        'task_id': task_id
+                        'task_id': task_id,
+                        **plan_meta
                     }
                 )
                 
-                generator = TurkishSongGenerator(None)  # Auto-select model
+                generator = TurkishSongGenerator(plan['model'])  # Resource/deadline-based selection
                 
                 self.update_state(
                     state='PROGRESS',
@@ -231,7 +666,8 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                         'stage': 'generating',
                         'progress': 30,
                         'message': 'Creating instrumental music...',
-                        'task_id': task_id
+                        'task_id': task_id,
+                        **plan_meta
                     }
                 )
                 
@@ -239,8 +675,17 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                     lyrics=lyrics_text,
                     style=style_text,
                     duration=duration,
-                    output_name=f"music/bestewk_instrumental_{int(time.time())}",
-                    instrumental=True
+                    output_name=f"music/{output_stem}_instrumental",
+                    instrumental=True,
+                    resume=True,
+                    seed=seed,
+                    stream=progressive,
+                    progress_callback=_progressive_callback(
+                        f"music/{output_stem}_instrumental.wav",
+                        'generating',
+                        'Creating instrumental music...'
+                    ),
+                    generation_overrides=plan['overrides']
                 )
                 
             elif mode == "Vocals Only (RVC)":
@@ -252,14 +697,15 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                         'stage': 'vocals',
                         'progress': 25,
                         'message': 'Generating vocals with RVC...',
-                        'task_id': task_id
+                        'task_id': task_id,
+                        **plan_meta
                     }
                 )
                 
                 rvc_singer = RVCSinger(rvc_model_path, None)
                 output_file = await rvc_singer.generate_singing_voice(
                     lyrics=lyrics_text,
-                    output_path=f"music/bestewk_vocals_{int(time.time())}.wav"
+                    output_path=f"music/{output_stem}_vocals.wav"
                 )
             
             # Final progress update
@@ -273,13 +719,21 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                 }
             )
         
+        # Estimate the job's footprint for the resource-aware scheduler
+        job_memory_gb = 1.5  # TTS + RVC only
+        if mode != "Vocals Only (RVC)" and scheduler_enabled():
+            from bestekar import estimate_generation_footprint_gb
+            job_memory_gb = estimate_generation_footprint_gb(plan['model'], duration)
+        
         # Run the async generation
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(_run_generation())
-        finally:
-            loop.close()
+        with scheduled_job(self, task_id, job_memory_gb):
+            _mark_admitted(plan_meta, plan)
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(_run_generation())
+            finally:
+                loop.close()
         
         # Check results and finalize
         elapsed_time = time.time() - start_time
@@ -304,7 +758,8 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
                 'duration': duration,
                 'progress': 100,
                 'message': 'Generation completed successfully!',
-                'task_id': task_id
+                'task_id': task_id,
+                **plan_meta
             }
         else:
             logger.error(f"Music generation task {task_id} failed - no output file created")
@@ -336,6 +791,294 @@ def generate_music_task(self, lyrics_text: str, style_text: str, duration: int,
             'task_id': task_id
         }
 
+@celery_app.task(bind=True, name='bestewk.generate_music_batch', queue='generate_music')
+def generate_music_batch_task(self, items: List[Dict[str, Any]], duration: int = 30,
+                              instrumental: bool = True):
+    """
+    Celery task for rendering several (lyrics, style) pairs in batched passes.
+    
+    Args:
+        items: List of dicts with 'lyrics_text' and 'style_text' keys and an
+            optional per-item 'duration' override
+        duration: Default duration in seconds
+        instrumental: Whether to generate instrumental tracks
+    
+    Returns:
+        Dict with one result entry per input item
+    """
+    task_id = self.request.id
+    start_time = time.time()
+    
+    try:
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'stage': 'setup',
+                'progress': 10,
+                'message': f'Preparing batch of {len(items)} songs...',
+                'task_id': task_id
+            }
+        )
+        
+        from bestekar import TurkishSongGenerator
+        
+        output_dir = Path("music")
+        output_dir.mkdir(exist_ok=True)
+        
+        stamp = int(time.time())
+        requests = [
+            {
+                'lyrics': item.get('lyrics_text', ''),
+                'style': item.get('style_text', ''),
+                'duration': int(item.get('duration', duration)),
+                'instrumental': instrumental,
+                'output_name': f"music/bestewk_batch_{stamp}_{i:02d}",
+            }
+            for i, item in enumerate(items)
+        ]
+        
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'stage': 'generating',
+                'progress': 30,
+                'message': f'Generating {len(items)} songs in batches...',
+                'task_id': task_id
+            }
+        )
+        
+        generator = TurkishSongGenerator(None)  # Auto-select model
+        
+        # Output buffers grow with the number of songs in the batch
+        from bestekar import estimate_generation_footprint_gb
+        longest = max((r['duration'] for r in requests), default=duration)
+        job_memory_gb = estimate_generation_footprint_gb(generator.requested_model, longest * max(1, len(requests)))
+        
+        with scheduled_job(self, task_id, job_memory_gb):
+            output_files = generator.generate_batch(requests)
+        
+        elapsed_time = time.time() - start_time
+        results = [
+            {
+                'output_file': str(f) if f else None,
+                'filename': Path(f).name if f else None,
+                'status': 'SUCCESS' if f and Path(f).exists() else 'FAILURE',
+            }
+            for f in output_files
+        ]
+        succeeded = sum(1 for r in results if r['status'] == 'SUCCESS')
+        
+        logger.success(
+            f"Batch generation task {task_id} finished",
+            succeeded=succeeded,
+            total=len(results),
+            duration=f"{elapsed_time:.1f}s"
+        )
+        
+        return {
+            'status': 'SUCCESS' if succeeded == len(results) else ('PARTIAL' if succeeded else 'FAILURE'),
+            'results': results,
+            'generation_time': elapsed_time,
+            'progress': 100,
+            'message': f'{succeeded}/{len(results)} songs generated',
+            'task_id': task_id
+        }
+        
+    except Exception as e:
+        elapsed_time = time.time() - start_time
+        error_msg = str(e)
+        
+        logger.exception(f"Batch generation task {task_id} crashed", error=error_msg)
+        
+        return {
+            'status': 'FAILURE',
+            'error': error_msg,
+            'generation_time': elapsed_time,
+            'progress': 0,
+            'message': f'Batch generation failed: {error_msg}',
+            'task_id': task_id
+        }
+
+# --------------------------------------------------
+# Complete-Song Pipeline Stages
+# --------------------------------------------------
+#
+# The complete-song mode as a DAG:  instrumental ∥ (tts → rvc) → mix.
+# Each stage runs on its own queue so the instrumental and vocal branches
+# can be processed by different workers at the same time.
+
+@celery_app.task(bind=True, name='bestewk.stage_instrumental', queue='generate_music')
+def stage_instrumental_task(self, lyrics_text: str, style_text: str, duration: int,
+                            output_stem: str, progressive: bool = False,
+                            deadline_seconds: Optional[float] = None,
+                            report_to: Optional[str] = None) -> str:
+    """Pipeline stage: generate the instrumental backing track.
+    
+    Progress, the plan and the progressive preview are also written to
+    *report_to* (the mix stage's id that clients monitor) until the mix
+    stage reports for itself.
+    """
+    task_id = self.request.id
+    import zlib
+    from bestekar import TurkishSongGenerator, plan_generation, estimate_generation_footprint_gb
+    
+    Path("music").mkdir(exist_ok=True)
+    preview_file = f"music/{output_stem}_instrumental.wav"
+    plan = plan_generation(duration, deadline_seconds)
+    plan_meta = _instrumental_plan_meta(plan)
+    
+    def _publish(meta: Dict[str, Any]):
+        self.update_state(state='PROGRESS', meta={**meta, 'task_id': task_id})
+        if report_to:
+            self.update_state(task_id=report_to, state='PROGRESS', meta={**meta, 'task_id': report_to})
+    
+    def _report(playable_seconds: float):
+        _publish({
+            'stage': 'instrumental',
+            'progress': int(min(playable_seconds / max(duration, 1), 1.0) * 100),
+            'message': f'Generating instrumental ({int(playable_seconds)}s playable)',
+            'preview_file': preview_file,
+            'playable_seconds': playable_seconds,
+            **plan_meta
+        })
+    
+    _publish({'stage': 'instrumental', 'progress': 0, 'message': 'Generating instrumental...', **plan_meta})
+    job_memory_gb = estimate_generation_footprint_gb(plan['model'], duration) if scheduler_enabled() else 0.0
+    with scheduled_job(self, task_id, job_memory_gb):
+        _mark_admitted(plan_meta, plan)
+        output_file = TurkishSongGenerator(plan['model']).generate_song(
+            lyrics=lyrics_text,
+            style=style_text,
+            duration=duration,
+            output_name=f"music/{output_stem}_instrumental",
+            instrumental=True,
+            resume=True,
+            seed=zlib.crc32(output_stem.encode()) & 0x7FFFFFFF,
+            stream=progressive,
+            progress_callback=_report if progressive else None,
+            generation_overrides=plan['overrides']
+        )
+    
+    if not output_file or not Path(output_file).exists():
+        raise RuntimeError("Instrumental generation failed")
+    logger.info(f"Pipeline instrumental ready: {output_file}")
+    return str(output_file)
+
+@celery_app.task(name='bestewk.stage_tts', queue='vocals')
+def stage_tts_task(lyrics_text: str, output_stem: str, voice: str = "tr-TR-EmelNeural") -> Optional[str]:
+    """Pipeline stage: synthesize the lyrics with Edge TTS."""
+    from bestekar import RVCSinger
+    
+    Path("music").mkdir(exist_ok=True)
+    tts_path = f"music/{output_stem}_tts.wav"
+    
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(RVCSinger.text_to_speech(lyrics_text, voice, tts_path))
+    finally:
+        loop.close()
+    
+    if not result:
+        logger.warning("Pipeline TTS stage failed, continuing without vocals")
+        return None
+    return result
+
+@celery_app.task(name='bestewk.stage_rvc', queue='vocals')
+def stage_rvc_task(tts_path: Optional[str], output_stem: str, rvc_model_path: str = "") -> Optional[str]:
+    """Pipeline stage: convert the TTS voice with RVC (falls back to plain TTS)."""
+    if not tts_path or not Path(tts_path).exists():
+        return None
+    
+    import shutil
+    from bestekar import RVCSinger
+    
+    vocal_path = f"music/{output_stem}_vocals.wav"
+    singer = RVCSinger(rvc_model_path or None, None)
+    if singer.rvc_model_path and singer.convert_voice_with_rvc(tts_path, vocal_path):
+        try:
+            os.unlink(tts_path)
+        except OSError:
+            pass
+        return vocal_path
+    
+    # Fallback: Use original TTS
+    logger.warning("Pipeline RVC stage failed, using TTS vocals")
+    shutil.move(tts_path, vocal_path)
+    return vocal_path
+
+@celery_app.task(bind=True, name='bestewk.stage_mix', queue='mix')
+def stage_mix_task(self, track_paths: List[Optional[str]], output_stem: str,
+                   started_at: Optional[float] = None) -> Dict[str, Any]:
+    """Pipeline stage: mix the instrumental with the vocals (chord callback)."""
+    task_id = self.request.id
+    from bestekar import mix_audio_tracks
+    
+    instrumental_file, vocal_file = (list(track_paths) + [None, None])[:2]
+    output_file = instrumental_file
+    if instrumental_file and vocal_file:
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'stage': 'mixing',
+                'progress': 90,
+                'message': 'Mixing vocals with instrumental...',
+                'task_id': task_id
+            }
+        )
+        output_file = mix_audio_tracks(instrumental_file, vocal_file, f"music/{output_stem}") or instrumental_file
+    
+    elapsed_time = time.time() - started_at if started_at else None
+    if not output_file or not Path(output_file).exists():
+        return {
+            'status': 'FAILURE',
+            'error': 'No output file generated',
+            'mode': 'Complete Song (RVC)',
+            'generation_time': elapsed_time,
+            'progress': 0,
+            'message': 'Generation failed - no output created',
+            'task_id': task_id
+        }
+    
+    file_size = Path(output_file).stat().st_size / (1024 * 1024)  # MB
+    logger.success(f"Pipeline {output_stem} completed", file=output_file)
+    return {
+        'status': 'SUCCESS',
+        'output_file': str(output_file),
+        'filename': Path(output_file).name,
+        'file_size_mb': file_size,
+        'generation_time': elapsed_time,
+        'mode': 'Complete Song (RVC)',
+        'progress': 100,
+        'message': 'Generation completed successfully!',
+        'task_id': task_id
+    }
+
+def build_complete_song_pipeline(lyrics_text: str, style_text: str, duration: int,
+                                 rvc_model_path: str = "", output_stem: Optional[str] = None,
+                                 progressive: bool = False, deadline_seconds: Optional[float] = None):
+    """Build the complete-song canvas: instrumental ∥ (tts → rvc) → mix.
+    
+    The mix stage gets a fixed task id up front so the instrumental stage
+    can forward its progress to the id clients monitor.
+    """
+    from celery import chain, chord, group
+    import uuid
+    
+    output_stem = output_stem or f"bestewk_{uuid.uuid4().hex[:12]}"
+    mix_task_id = str(uuid.uuid4())
+    return chord(
+        group(
+            stage_instrumental_task.s(
+                lyrics_text, style_text, duration, output_stem, progressive, deadline_seconds, mix_task_id
+            ),
+            chain(
+                stage_tts_task.s(lyrics_text, output_stem),
+                stage_rvc_task.s(output_stem, rvc_model_path),
+            ),
+        ),
+        stage_mix_task.s(output_stem, time.time()).set(task_id=mix_task_id),
+    )
+
 @celery_app.task(name='bestewk.open_help', queue='ui_actions')
 def open_help_task():
     """Celery task for opening help page."""
@@ -451,6 +1194,16 @@ def app_init_task():
 # Task Management Functions
 # --------------------------------------------------
 
+# Tasks that show up as music generation jobs in the tray and on shutdown
+GENERATION_TASK_NAMES = (
+    'bestewk.generate_music',
+    'bestewk.generate_music_batch',
+    'bestewk.stage_instrumental',
+    'bestewk.stage_tts',
+    'bestewk.stage_rvc',
+    'bestewk.stage_mix',
+)
+
 def get_active_generation_tasks() -> List[Dict[str, Any]]:
     """Get all active music generation tasks."""
     try:
@@ -462,7 +1215,7 @@ def get_active_generation_tasks() -> List[Dict[str, Any]]:
         if active:
             for worker, tasks in active.items():
                 for task in tasks:
-                    if task['name'] == 'bestewk.generate_music':
+                    if task['name'] in GENERATION_TASK_NAMES:
                         active_tasks.append({
                             'id': task['id'],
                             'name': task['name'],
@@ -478,7 +1231,7 @@ def get_active_generation_tasks() -> List[Dict[str, Any]]:
         if scheduled:
             for worker, tasks in scheduled.items():
                 for task in tasks:
-                    if task['request']['name'] == 'bestewk.generate_music':
+                    if task['request']['name'] in GENERATION_TASK_NAMES:
                         active_tasks.append({
                             'id': task['request']['id'],
                             'name': task['request']['name'],
@@ -494,7 +1247,7 @@ def get_active_generation_tasks() -> List[Dict[str, Any]]:
         if reserved:
             for worker, tasks in reserved.items():
                 for task in tasks:
-                    if task['name'] == 'bestewk.generate_music':
+                    if task['name'] in GENERATION_TASK_NAMES:
                         active_tasks.append({
                             'id': task['id'],
                             'name': task['name'],
@@ -596,7 +1349,33 @@ def worker_ready_handler(sender=None, **kwargs):
     """Handle worker ready signal."""
     logger.info("Bestewk worker is ready and accepting tasks")
     logger.info(f"Worker: {sender}")
-    logger.info("Queues: generate_music, ui_actions")
+    logger.info("Queues: generate_music, vocals, mix, ui_actions")
+    
+    # Prefork children preload for themselves (worker_process_init); the
+    # parent only supervises and would hold an unused copy
+    if not resolve_broker_config()['multiprocess']:
+        _preload_model()
+
+@worker_process_init.connect
+def worker_process_init_handler(sender=None, **kwargs):
+    """Warm the model registry in each prefork child."""
+    _preload_model()
+
+def _preload_model() -> None:
+    """Optionally warm the model registry so the first job starts immediately."""
+    preload_model = os.getenv("BESTEWK_PRELOAD_MODEL")
+    if not preload_model:
+        return
+    try:
+        from bestekar import TurkishSongGenerator
+        
+        model_name = None if preload_model.lower() == "auto" else preload_model
+        if TurkishSongGenerator(model_name).setup_model():
+            logger.info(f"Preloaded MusicGen model: {preload_model}")
+            if scheduler_enabled():
+                get_scheduler().record_resident(_resident_models_gb())
+    except Exception as e:
+        logger.warning(f"Model preload failed: {e}")
 
 @worker_shutdown.connect
 def worker_shutdown_handler(sender=None, **kwargs):
@@ -613,6 +1392,15 @@ def worker_shutdown_handler(sender=None, **kwargs):
                 revoke_task(task['id'], terminate=True)
     except Exception as e:
         logger.error(f"Error during worker shutdown cleanup: {e}")
+    
+    # Release cached models/converters only if bestekar was actually loaded in this worker
+    bestekar_module = sys.modules.get('bestekar')
+    if bestekar_module is not None and hasattr(bestekar_module, 'get_model_registry'):
+        try:
+            bestekar_module.get_model_registry().clear()
+            bestekar_module.get_rvc_converter_cache().release()
+        except Exception as e:
+            logger.error(f"Error releasing cached models: {e}")
 
 # --------------------------------------------------
 # Worker Entry Point
@@ -620,10 +1408,16 @@ def worker_shutdown_handler(sender=None, **kwargs):
 
 def run_worker(argv=None):
     """Run Celery worker for processing tasks."""
+    broker_config = resolve_broker_config()
+    multiprocess = broker_config['multiprocess']
+    
     print("🎵 Bestewk - Bestekar Task Worker")
     print("=" * 50)
-    print("📋 Processing queues: generate_music, ui_actions")
-    print("🔄 Memory-based broker (no Redis/RabbitMQ required)")
+    print("📋 Processing queues: generate_music, vocals, mix, ui_actions")
+    if multiprocess:
+        print(f"🔄 Shared broker: {broker_config['broker']}")
+    else:
+        print("🔄 Memory-based broker (no Redis/RabbitMQ required)")
     print("🎯 Optimized for music generation tasks")
     print("💡 Use Ctrl+C to stop the worker")
     print("=" * 50)
@@ -632,14 +1426,33 @@ def run_worker(argv=None):
     worker_args = [
         'worker',
         '--loglevel=INFO',
-        '--queues=generate_music,ui_actions',
-        '--concurrency=1',  # Single process for memory broker
-        '--pool=solo',      # Use solo pool for memory broker compatibility
-        '--without-gossip', # Disable gossip for memory broker
-        '--without-mingle', # Disable mingle for memory broker
-        '--without-heartbeat', # Disable heartbeat for memory broker
+        '--queues=generate_music,vocals,mix,ui_actions',
+        '--without-gossip', # No broadcast support on local brokers
+        '--without-mingle', # No broadcast support on local brokers
+        '--without-heartbeat', # No broadcast support on local brokers
     ]
     
+    if multiprocess:
+        # Shared brokers let several processes drain the queues in parallel
+        try:
+            concurrency = max(1, int(os.getenv("BESTEWK_CONCURRENCY", "1")))
+        except ValueError:
+            concurrency = 1
+        if scheduler_enabled():
+            # Size the pool to what fits; per-job admission happens in the tasks
+            plan = plan_worker_capacity()
+            concurrency = plan['max_jobs']
+            print(
+                f"🧮 Scheduler: up to {plan['max_jobs']} concurrent jobs, "
+                f"{plan['threads_per_job']} threads each, {plan['memory_budget_gb']:.1f}GB budget"
+            )
+        worker_args += [f'--concurrency={concurrency}', '--pool=prefork']
+    else:
+        worker_args += [
+            '--concurrency=1',  # Single process for memory broker
+            '--pool=solo',      # Use solo pool for memory broker compatibility
+        ]
+    
     if argv:
         worker_args.extend(argv)
     
@@ -661,13 +1474,28 @@ def run_worker(argv=None):
 # --------------------------------------------------
 
 def submit_music_generation(lyrics_text: str, style_text: str, duration: int, 
-                          rvc_model_path: str = "", mode: str = "Complete Song (RVC)") -> str:
+                          rvc_model_path: str = "", mode: str = "Complete Song (RVC)",
+                          progressive: bool = False, pipeline: bool = False,
+                          deadline_seconds: Optional[float] = None) -> str:
     """
     Submit a music generation task.
     
+    With *pipeline* the complete-song mode runs as separate stage tasks
+    (instrumental ∥ TTS → RVC, then mix) instead of one monolithic task.
+    *deadline_seconds* is a latency budget used to pick model and
+    parameters; the predicted completion time appears in the task meta.
+    
     Returns:
-        Task ID for monitoring
+        Task ID for monitoring (the mix stage when pipelined)
     """
+    if pipeline and mode == "Complete Song (RVC)":
+        result = build_complete_song_pipeline(
+            lyrics_text, style_text, duration, rvc_model_path, progressive=progressive,
+            deadline_seconds=deadline_seconds
+        ).apply_async()
+        logger.info(f"Submitted complete-song pipeline {result.id}")
+        return result.id
+    
     task = celery_app.send_task(
         'bestewk.generate_music',
         kwargs={
@@ -676,12 +1504,34 @@ def submit_music_generation(lyrics_text: str, style_text: str, duration: int,
             'duration': duration,
             'rvc_model_path': rvc_model_path,
             'mode': mode,
+            'progressive': progressive,
+            'deadline_seconds': deadline_seconds,
         },
     )
     
     logger.info(f"Submitted music generation task {task.id}")
     return task.id
 
+def submit_music_batch(items: List[Dict[str, Any]], duration: int = 30,
+                       instrumental: bool = True) -> str:
+    """
+    Submit a batched music generation task.
+    
+    Returns:
+        Task ID for monitoring
+    """
+    task = celery_app.send_task(
+        'bestewk.generate_music_batch',
+        kwargs={
+            'items': items,
+            'duration': duration,
+            'instrumental': instrumental,
+        },
+    )
+    
+    logger.info(f"Submitted batch generation task {task.id} ({len(items)} items)")
+    return task.id
+
 def submit_help_action() -> str:
     """Submit help action task."""
     task = celery_app.send_task('bestewk.open_help')
@@ -698,6 +1548,11 @@ def submit_exit_action() -> str:
 __all__ = [
     'celery_app',
     'generate_music_task',
+    'generate_music_batch_task',
+    'stage_instrumental_task',
+    'stage_tts_task',
+    'stage_rvc_task',
+    'stage_mix_task',
     'open_help_task', 
     'exit_app_task',
     'app_init_task',
@@ -705,7 +1560,13 @@ __all__ = [
     'get_task_result',
     'revoke_task',
     'get_worker_stats',
+    'resolve_broker_config',
+    'plan_worker_capacity',
+    'ResourceScheduler',
+    'get_scheduler',
     'submit_music_generation',
+    'submit_music_batch',
+    'build_complete_song_pipeline',
     'submit_help_action',
     'submit_exit_action',
     'run_worker'
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Run against the source tree without requiring an installed package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,123 @@
+"""Download manager against a local HTTP server with Range support."""
+
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("requests")
+
+import bestedl  # noqa: E402
+from bestedl import DownloadError, download_file  # noqa: E402
+
+PAYLOAD = bytes(range(256)) * 64  # 16 KiB
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send_headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._send_headers(200, len(PAYLOAD))
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        self.server.ranges.append(header)
+        if not header:
+            self._send_headers(200, len(PAYLOAD))
+            self.wfile.write(PAYLOAD)
+            return
+        start, end = re.fullmatch(r"bytes=(\d+)-(\d*)", header).groups()
+        start = int(start)
+        end = int(end) if end else len(PAYLOAD) - 1
+        if start >= len(PAYLOAD):
+            self._send_headers(416, 0, {"Content-Range": f"bytes */{len(PAYLOAD)}"})
+            return
+        body = PAYLOAD[start:end + 1]
+        self._send_headers(206, len(body), {"Content-Range": f"bytes {start}-{end}/{len(PAYLOAD)}"})
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    httpd.ranges = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}/model.bin"
+
+
+def _part_path(dest, url):
+    return dest.with_name(f"{dest.name}.{hashlib.sha1(url.encode()).hexdigest()[:8]}.part")
+
+
+def test_download_verifies_checksum(server, tmp_path):
+    dest = tmp_path / "model.bin"
+    result = download_file(_url(server), dest, sha256=hashlib.sha256(PAYLOAD).hexdigest())
+    assert result == str(dest)
+    assert dest.read_bytes() == PAYLOAD
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_download_in_parallel_ranges(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(bestedl, "DOWNLOAD_SEGMENT_THRESHOLD", 1024)
+    dest = tmp_path / "model.bin"
+    download_file(_url(server), dest, segments=4)
+    assert dest.read_bytes() == PAYLOAD
+    assert len([r for r in server.ranges if r]) == 4
+
+
+def test_resume_from_part(server, tmp_path):
+    dest = tmp_path / "model.bin"
+    url = _url(server)
+    _part_path(dest, url).write_bytes(PAYLOAD[:5000])
+    download_file(url, dest)
+    assert server.ranges == ["bytes=5000-"]
+    assert dest.read_bytes() == PAYLOAD
+
+
+def test_sha_mismatch_discards_part(server, tmp_path):
+    dest = tmp_path / "model.bin"
+    with pytest.raises(DownloadError, match="SHA-256 mismatch"):
+        download_file(_url(server), dest, sha256="0" * 64)
+    assert not dest.exists()
+    assert not _part_path(dest, _url(server)).exists()
+
+
+def test_complete_part_is_verified_not_refetched(server, tmp_path):
+    dest = tmp_path / "model.bin"
+    url = _url(server)
+    _part_path(dest, url).write_bytes(PAYLOAD)
+    download_file(url, dest, sha256=hashlib.sha256(PAYLOAD).hexdigest())
+    assert server.ranges == []
+    assert dest.read_bytes() == PAYLOAD
+
+
+def test_complete_part_survives_416(server, tmp_path, monkeypatch):
+    # Without a Content-Length the resume request runs past the end
+    monkeypatch.setattr(_RangeHandler, "do_HEAD", lambda self: self._send_headers(200, 0))
+    dest = tmp_path / "model.bin"
+    url = _url(server)
+    _part_path(dest, url).write_bytes(PAYLOAD)
+    download_file(url, dest, sha256=hashlib.sha256(PAYLOAD).hexdigest())
+    assert server.ranges == [f"bytes={len(PAYLOAD)}-"]
+    assert dest.read_bytes() == PAYLOAD
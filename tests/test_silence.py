@@ -0,0 +1,44 @@
+"""Vectorized silence detection must agree with pydub's reference loop."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+silence = pytest.importorskip("pydub.silence")
+AudioSegment = pytest.importorskip("pydub").AudioSegment
+besteml = pytest.importorskip("besteml")
+
+
+def _random_clip(rng, sr, channels):
+    """Bursts of tone and noise separated by silences of varying length."""
+    pieces = []
+    for _ in range(rng.integers(2, 8)):
+        n = int(rng.integers(sr // 20, sr * 2))
+        if rng.random() < 0.5:
+            pieces.append(rng.normal(0, rng.uniform(0.0, 0.004), (n, channels)))
+        else:
+            tone = np.sin(2 * np.pi * rng.uniform(80, 2000) * np.arange(n) / sr)
+            pieces.append(rng.uniform(0.01, 0.9) * np.repeat(tone[:, None], channels, axis=1))
+    pcm = np.clip(np.concatenate(pieces) * 32768.0, -32768, 32767).astype(np.int16)
+    return pcm
+
+
+@pytest.mark.parametrize("trial", range(40))
+def test_detect_nonsilent_matches_pydub(trial):
+    rng = np.random.default_rng(trial)
+    sr = int(rng.choice([8000, 16000, 22050, 44100]))
+    channels = int(rng.integers(1, 3))
+    min_silence_len = int(rng.choice([100, 300, 500]))
+    silence_thresh = float(rng.choice([-50.0, -40.0, -30.0]))
+    pcm = _random_clip(rng, sr, channels)
+
+    segment = AudioSegment(pcm.tobytes(), frame_rate=sr, sample_width=2, channels=channels)
+    expected = silence.detect_nonsilent(segment, min_silence_len=min_silence_len, silence_thresh=silence_thresh)
+    audio = pcm.astype(np.float32) / 32768.0
+    got = besteml.detect_nonsilent(audio, sr, min_silence_len=min_silence_len, silence_thresh=silence_thresh)
+    assert got == expected
+
+
+def test_detect_nonsilent_is_deterministic():
+    pcm = _random_clip(np.random.default_rng(7), 16000, 2)
+    audio = pcm.astype(np.float32) / 32768.0
+    assert besteml.detect_nonsilent(audio, 16000) == besteml.detect_nonsilent(audio.copy(), 16000)
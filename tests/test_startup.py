@@ -0,0 +1,22 @@
+"""Startup budget: ``import bestekar`` must stay light enough for the tray."""
+
+import os
+
+import pytest
+
+pytest.importorskip("loguru")
+
+import bestekar  # noqa: E402
+
+
+def test_import_skips_heavy_modules():
+    result = bestekar.benchmark_import_time(runs=1)
+    assert result["heavy_modules"] == []
+
+
+def test_import_within_budget():
+    budget_s = float(os.getenv("BESTEKAR_IMPORT_BUDGET", "1.0"))
+    result = bestekar.benchmark_import_time()
+    assert result["seconds"] <= budget_s, (
+        f"import bestekar took {result['seconds']:.3f}s, budget is {budget_s:.2f}s"
+    )